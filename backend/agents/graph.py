@@ -1,46 +1,151 @@
 from typing_extensions import TypedDict
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Union
+from langchain_core.callbacks.manager import dispatch_custom_event
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph.message import add_messages
 from langgraph.graph import END, START, StateGraph
 from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolInvocationError
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
+import threading
+import time
 from pathlib import Path
 
-from backend.tools.arxiv import arxiv_search
-from backend.tools.read import read_pdf
+from backend.agents.routing import MODEL_TIER_ESCALATIONS, choose_tier, escalation_reason, record_tier_call
+from backend.tools.arxiv import arxiv_batch_search, arxiv_search
+from backend.tools.read import read_pdf, read_pdfs, summarize_paper
 from backend.tools.write import render_latex_pdf
 from backend.tools.comprehensive_paper import generate_comprehensive_paper
+from backend.services.cancellation import check_cancelled
+from backend.services.llm_cache import cache_key, get_llm_cache
+from backend.services.model_calls import MODEL_CALL_TIMEOUT_SECONDS, model_caller
+from backend.services.scheduler import CapacityExceeded, record_rejection, scheduler
 
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 gemini_key = os.getenv("GEMINI_API_KEY")
 gemini_model = os.getenv("GEMINI_MODEL", "write-your-model-here")
-if not gemini_key:
-    raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
+gemini_fast_model = os.getenv("GEMINI_FAST_MODEL", gemini_model)
+model_provider = os.getenv("MODEL_PROVIDER", "gemini").lower()
+model_routing = os.getenv("MODEL_ROUTING", "off").lower()
+scripted_latency = float(os.getenv("SCRIPTED_MODEL_LATENCY", "0"))
+scripted_jitter = float(os.getenv("SCRIPTED_MODEL_JITTER", "0"))
+scripted_fast_latency = float(os.getenv("SCRIPTED_FAST_MODEL_LATENCY", "0"))
+
+MODEL_PARAMS = {"max_tokens": 8000, "temperature": 0.3, "top_p": 0.8, "top_k": 40}
+FAST_MODEL_PARAMS = {**MODEL_PARAMS, "max_tokens": int(os.getenv("FAST_MODEL_MAX_TOKENS", "1024"))}
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
 
-tools = [arxiv_search, read_pdf, render_latex_pdf, generate_comprehensive_paper]
-tool_node = ToolNode(tools)
-model = ChatGoogleGenerativeAI(
-    model=gemini_model,
-    google_api_key=gemini_key,
-    max_tokens=8000,
-    temperature=0.3,
-    top_p=0.8,
-    top_k=40
-).bind_tools(tools)
-
-def call_model(state: State):
+tools = [arxiv_search, arxiv_batch_search, summarize_paper, read_pdf, read_pdfs, render_latex_pdf, generate_comprehensive_paper]
+
+_models = {}
+_model_fingerprints = {}
+_graph = None
+_init_lock = threading.Lock()
+
+def tier_settings(tier: str) -> tuple:
+    """The (Gemini model name, generation params) of a routing tier."""
+    if tier == "fast":
+        return gemini_fast_model, FAST_MODEL_PARAMS
+    return gemini_model, MODEL_PARAMS
+
+def build_model(tier: str = "large"):
+    if model_provider == "scripted":
+        from backend.agents.scripted_model import ScriptedChatModel
+        latency = scripted_fast_latency if tier == "fast" else scripted_latency
+        return ScriptedChatModel(latency=latency, jitter=scripted_jitter).bind_tools(tools)
+    if model_provider != "gemini":
+        raise ValueError(f"Unknown MODEL_PROVIDER {model_provider!r}; expected 'gemini' or 'scripted'.")
+
+    if not gemini_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
+
+    # Imported here because the Gemini client pulls in the whole google-genai SDK,
+    # which dominates startup time for workers that never serve a chat turn.
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    name, params = tier_settings(tier)
+    # model_caller owns deadlines and retries, so the SDK makes a single attempt per call.
+    return ChatGoogleGenerativeAI(
+        model=name,
+        google_api_key=gemini_key,
+        timeout=MODEL_CALL_TIMEOUT_SECONDS or None,
+        max_retries=1,
+        **params
+    ).bind_tools(tools)
+
+def get_model(tier: str = "large"):
+    model = _models.get(tier)
+    if model is None:
+        with _init_lock:
+            model = _models.get(tier)
+            if model is None:
+                model = _models[tier] = build_model(tier)
+    return model
+
+def model_fingerprint(tier: str = "large") -> dict:
+    """Everything besides the messages that determines what the model answers."""
+    fingerprint = _model_fingerprints.get(tier)
+    if fingerprint is None:
+        from langchain_core.utils.function_calling import convert_to_openai_tool
+        name, params = tier_settings(tier)
+        fingerprint = _model_fingerprints[tier] = {
+            "provider": model_provider,
+            "model": name if model_provider == "gemini" else model_provider,
+            "params": params,
+            "tools": [convert_to_openai_tool(t) for t in tools],
+        }
+    return fingerprint
+
+def invoke_tier(tier: str, messages, model=None):
+    """The tier's answer to ``messages`` and the run ID of the model call that produced it."""
+    started = time.perf_counter()
+    response, run_id = model_caller.invoke_with_run_id(model or get_model(tier), messages, key=tier)
+    record_tier_call(tier, time.perf_counter() - started, response)
+    return response, run_id
+
+def call_model(state: State, config: RunnableConfig, model=None):
     messages = state["messages"]
-    response = model.invoke(messages)
+    thread_id = config.get("configurable", {}).get("thread_id")
+    # An explicitly passed model (replay, benchmarks) serves every step.
+    tier = choose_tier(messages) if model_routing == "tiered" and model is None else "large"
+
+    # Cache hits are answered before queueing for a model slot.
+    llm_cache = get_llm_cache() if model is None else None
+    key = cache_key(messages, model_fingerprint(tier)) if llm_cache is not None else None
+    response = llm_cache.get(key) if llm_cache is not None else None
+    if response is None:
+        check_cancelled()
+        with scheduler.acquire("model", thread_id):
+            response, run_id = invoke_tier(tier, messages, model)
+            reason = escalation_reason(response) if tier == "fast" else None
+            if reason is not None:
+                MODEL_TIER_ESCALATIONS.inc(reason=reason)
+                # The session recorder has logged the fast answer already; have replay skip it.
+                dispatch_custom_event("model_discarded", {"run_id": str(run_id)}, config=config)
+                tier = "large"
+                response, _ = invoke_tier(tier, messages)
+        if llm_cache is not None:
+            llm_cache.put(key, response)
+        # A model call can't be interrupted; drop its answer if the turn was cancelled meanwhile.
+        check_cancelled()
+    else:
+        # No model callback fires for a hit; let the session recorder log the answer the turn used.
+        dispatch_custom_event("llm_cache_hit", {"response": response, "input_messages": len(messages)}, config=config)
     return {"messages": [response]}
 
+def handle_tool_errors(e: Union[CapacityExceeded, ToolInvocationError]) -> str:
+    # A busy tool becomes an error ToolMessage so the thread's tool calls stay answered.
+    if isinstance(e, CapacityExceeded):
+        record_rejection(e)
+        return f"Error: {e}. Tell the user the service is busy and ask them to try again shortly."
+    return e.message
+
 def should_continue(state: State) -> Literal["tools", END]:
     messages = state["messages"]
     last_message = messages[-1]
@@ -48,12 +153,30 @@ def should_continue(state: State) -> Literal["tools", END]:
         return "tools"
     return END
 
-workflow = StateGraph(State)
-workflow.add_node("agent", call_model)
-workflow.add_node("tools", tool_node)
-workflow.add_edge(START, "agent")
-workflow.add_conditional_edges("agent", should_continue)
-workflow.add_edge("tools", "agent")
+def build_graph(checkpointer, model=None, graph_tools=None):
+    """Compile the agent graph; ``model`` and ``graph_tools`` replace the defaults (e.g. for replay)."""
+    def agent(state: State, config: RunnableConfig):
+        return call_model(state, config, model)
+
+    workflow = StateGraph(State)
+    workflow.add_node("agent", agent)
+    workflow.add_node("tools", ToolNode(graph_tools or tools, handle_tool_errors=handle_tool_errors))
+    workflow.add_edge(START, "agent")
+    workflow.add_conditional_edges("agent", should_continue)
+    workflow.add_edge("tools", "agent")
+    return workflow.compile(checkpointer=checkpointer)
 
 checkpointer = MemorySaver()
-graph = workflow.compile(checkpointer=checkpointer)
+
+def get_graph():
+    global _graph
+    if _graph is None:
+        with _init_lock:
+            if _graph is None:
+                _graph = build_graph(checkpointer)
+    return _graph
+
+def __getattr__(name: str):
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
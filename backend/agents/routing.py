@@ -0,0 +1,62 @@
+import os
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from backend.monitoring.metrics import registry
+
+ROUTING_MAX_FAST_CHARS = int(os.getenv("ROUTING_MAX_FAST_CHARS", "500"))
+
+# Results the model has to digest, and the tool whose arguments are the paper's content.
+ANALYSIS_TOOLS = frozenset({"summarize_paper", "read_pdf", "read_pdfs"})
+GENERATION_TOOLS = frozenset({"generate_comprehensive_paper"})
+TRUNCATED_FINISH_REASONS = frozenset({"MAX_TOKENS", "length"})
+
+MODEL_TIER_CALLS = registry.counter("model_tier_calls_total", "Chat model calls by routing tier.", ["tier"])
+MODEL_TIER_DURATION = registry.histogram("model_tier_duration_seconds", "Chat model call latency by routing tier.", ["tier"])
+MODEL_TIER_TOKENS = registry.counter("model_tier_tokens_total", "Chat model tokens by routing tier and kind (prompt or completion).", ["tier", "kind"])
+MODEL_TIER_ESCALATIONS = registry.counter("model_tier_escalations_total", "Fast-tier answers redone on the large tier, by reason.", ["reason"])
+
+
+def choose_tier(messages: List[BaseMessage]) -> str:
+    """The model tier for the next agent step, from where the conversation stands.
+
+    Steps that digest paper content or write the paper go to the large tier:
+    answering a paper analysis or generation result, and user turns between
+    analysing papers and writing the paper (topic selection, writing). The
+    rest (greeting, subtopic lists, searches, PDF rendering) go to the fast tier.
+    """
+    last = messages[-1]
+    if isinstance(last, ToolMessage):
+        results = []
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            results.append(message.name)
+        return "large" if ANALYSIS_TOOLS.union(GENERATION_TOOLS).intersection(results) else "fast"
+
+    if isinstance(last, HumanMessage) and len(str(last.content)) > ROUTING_MAX_FAST_CHARS:
+        return "large"
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage) and message.name in GENERATION_TOOLS:
+            return "fast"
+        if isinstance(message, ToolMessage) and message.name in ANALYSIS_TOOLS:
+            return "large"
+    return "fast"
+
+
+def escalation_reason(response: AIMessage) -> Optional[str]:
+    """Why a fast-tier answer has to be redone on the large tier, if it does."""
+    if response.response_metadata.get("finish_reason") in TRUNCATED_FINISH_REASONS:
+        return "truncated"
+    if any(call["name"] in GENERATION_TOOLS for call in response.tool_calls):
+        return "generation_tool_call"
+    return None
+
+
+def record_tier_call(tier: str, seconds: float, response: AIMessage) -> None:
+    MODEL_TIER_CALLS.inc(tier=tier)
+    MODEL_TIER_DURATION.observe(seconds, tier=tier)
+    usage = response.usage_metadata or {}
+    MODEL_TIER_TOKENS.inc(usage.get("input_tokens", 0), tier=tier, kind="prompt")
+    MODEL_TIER_TOKENS.inc(usage.get("output_tokens", 0), tier=tier, kind="completion")
@@ -0,0 +1,189 @@
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from backend.agents.prompts import INITIAL_PROMPT
+
+DEPTH_PHRASES = ("in depth", "in detail", "in full", "full text", "read paper", "read the paper")
+ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "1st": 1, "2nd": 2, "3rd": 3, "4th": 4, "5th": 5}
+
+
+def _prompt_subtopics() -> Dict[str, List[str]]:
+    subtopics = {}
+    listing = INITIAL_PROMPT.split("**SUBJECT SUBTOPICS:**", 1)[-1]
+    for line in listing.strip().splitlines():
+        if ":" in line:
+            subject, topics = line.split(":", 1)
+            subtopics[subject.strip().lower()] = [topic.strip() for topic in topics.split(",")]
+    return subtopics
+
+
+SUBTOPICS = _prompt_subtopics()
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Offline stand-in for Gemini that follows the INITIAL_PROMPT workflow.
+
+    Each user message is mapped to the reply or tool call the prompt asks for
+    (greeting, subtopic list, ``arxiv_search`` or ``arxiv_batch_search``,
+    ``summarize_paper`` for the chosen paper, or ``read_pdf`` with its URL when
+    the user asks for depth, ``read_pdfs`` for several papers, topic selection,
+    ``generate_comprehensive_paper`` and ``render_latex_pdf``), after sleeping ``latency`` seconds plus up to
+    ``jitter`` seconds drawn from a seeded RNG.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency": self.latency, "jitter": self.jitter, "seed": self.seed}
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        delay = self.latency
+        if self.jitter:
+            with self._rng_lock:
+                delay += self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        message = self.respond(messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(str(message.content)) // 4 + 10 * len(message.tool_calls)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            if last.name == "generate_comprehensive_paper":
+                return AIMessage(content=(
+                    "I have written your comprehensive research paper in LaTeX format in the backend.\n\n"
+                    "**Do you want me to generate the PDF?**\n\n"
+                    "Say \"Yes, generate PDF\" and I'll create a downloadable PDF file for you!"
+                ))
+            # The workflow asks for no text after arxiv_search, read_pdf and render_latex_pdf.
+            return AIMessage(content="")
+
+        text = str(last.content).strip()
+        lowered = text.lower()
+
+        if lowered.rstrip("!. ") in ("hello", "hi", "hey"):
+            return AIMessage(content="Hello! I'm Research Genie. Which subject would you like to write a research paper on?")
+
+        if lowered.startswith("make paper on"):
+            subject = text[len("make paper on"):].strip(" .")
+            topics = SUBTOPICS.get(subject.lower(), ["Foundations", "Methods", "Applications", "Open Problems"])
+            listing = "\n".join(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+            return AIMessage(content=f"{subject} is a vast field. Here are some subtopics:\n\n{listing}\n\nWhich subtopic interests you?")
+
+        numbers = [int(n) for n in re.findall(r"\d+", lowered.split("papers", 1)[1])] if "papers" in lowered else []
+        if len(numbers) > 1:
+            urls = [url for url in (self._paper_url(messages, number) for number in numbers) if url]
+            if urls:
+                return self._tool_call("read_pdfs", {"urls": urls})
+
+        depth = any(phrase in lowered for phrase in DEPTH_PHRASES)
+        if "paper" in lowered and ("interested in" in lowered or depth):
+            number = self._paper_number(lowered)
+            if number and not depth:
+                return self._tool_call("summarize_paper", {"paper_number": number})
+            url = self._paper_url(messages, number) if number else None
+            if url:
+                return self._tool_call("read_pdf", {"url": url})
+
+        if "interested in" in lowered:
+            topic = text.lower().split("interested in", 1)[1].strip(" .")
+            topics = [t.strip() for t in re.split(r",|\band\b", topic) if t.strip()]
+            if len(topics) > 1:
+                return self._tool_call("arxiv_batch_search", {"topics": topics})
+            return self._tool_call("arxiv_search", {"topic": topic})
+
+        if "choose best topics" in lowered:
+            return AIMessage(content=(
+                "Based on the paper analysis, I've selected these promising research directions:\n\n"
+                "1. **Scalable Methods** - Extending the approach to larger problem sizes\n"
+                "2. **Theoretical Guarantees** - Bounding the behaviour of the method\n"
+                "3. **Cross-Domain Applications** - Transferring the results to related fields\n\n"
+                "---\n\n**Should I write the paper?**\n\nSay \"Yes, write the paper\" and I'll create your comprehensive research paper!"
+            ))
+
+        if "write" in lowered:
+            return self._tool_call("generate_comprehensive_paper", {
+                "title": "Scalable Methods and Theoretical Guarantees",
+                "research_area": self._research_area(messages),
+                "key_findings": "Scalable methods, theoretical guarantees and cross-domain applications",
+                "methodology_description": "Analytical modelling backed by empirical evaluation on public benchmarks",
+                "related_papers_summary": self._analysis_excerpt(messages),
+            })
+
+        if "pdf" in lowered:
+            return self._tool_call("render_latex_pdf", {})
+
+        return AIMessage(content="Could you tell me which step of the research workflow you'd like to continue with?")
+
+    @staticmethod
+    def _tool_call(name: str, args: dict) -> AIMessage:
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex}"}])
+
+    @staticmethod
+    def _paper_number(text: str) -> Optional[int]:
+        match = re.search(r"paper\s*(\d+)", text)
+        if match:
+            return int(match.group(1))
+        for word, number in ORDINALS.items():
+            if f"{word} paper" in text:
+                return number
+        return None
+
+    @staticmethod
+    def _paper_url(messages: List[BaseMessage], number: int) -> Optional[str]:
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage) or message.name not in ("arxiv_search", "arxiv_batch_search"):
+                continue
+            if message.artifact:
+                papers = message.artifact.get("papers", [])
+                return papers[number - 1]["pdf"] if 0 < number <= len(papers) else None
+            links = re.findall(r"\[Download Paper\]\((.*?)\)", str(message.content))
+            return links[number - 1] if 0 < number <= len(links) else None
+        return None
+
+    @staticmethod
+    def _research_area(messages: List[BaseMessage]) -> str:
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage) and "interested in" in str(message.content).lower():
+                topic = str(message.content).lower().split("interested in", 1)[1].strip(" .")
+                if "paper" not in topic:
+                    return topic.title()
+        return "Computer Science"
+
+    @staticmethod
+    def _analysis_excerpt(messages: List[BaseMessage]) -> str:
+        for message in reversed(messages):
+            if isinstance(message, ToolMessage) and message.name in ("summarize_paper", "read_pdf", "read_pdfs"):
+                return str(message.content)[:500]
+        return ""
@@ -0,0 +1,53 @@
+from backend.monitoring.memory import allocation_tracker, checkpoint_sizes, latest_checkpoint_info
+from backend.schemas.admin import MemoryReport, ThreadEvictionResponse, ThreadInfo, ThreadListResponse
+from backend.services.cancellation import runs
+from backend.services.idempotency import chat_turns
+from backend.services.prefetch import pdf_prefetcher
+
+class AdminInteractor:
+    def __init__(self):
+        from backend.agents.graph import checkpointer
+        self.checkpointer = checkpointer
+
+    def list_threads(self, limit: int = 100) -> ThreadListResponse:
+        sizes = checkpoint_sizes(self.checkpointer)
+        largest = sorted(sizes.items(), key=lambda item: item[1]["bytes"], reverse=True)[:limit]
+
+        threads = [self._thread_info(thread_id, size) for thread_id, size in largest]
+        return ThreadListResponse(
+            threads=threads,
+            total_count=len(sizes),
+            total_bytes=sum(size["bytes"] for size in sizes.values())
+        )
+
+    def get_thread(self, thread_id: str) -> ThreadInfo:
+        size = checkpoint_sizes(self.checkpointer).get(thread_id)
+        if size is None:
+            raise FileNotFoundError(f"Thread {thread_id} not found")
+        return self._thread_info(thread_id, size)
+
+    def evict_thread(self, thread_id: str) -> ThreadEvictionResponse:
+        existed = thread_id in self.checkpointer.storage
+        runs.cancel(thread_id, reason="evicted")
+        self.checkpointer.delete_thread(thread_id)
+        pdf_prefetcher.cancel(thread_id)
+        chat_turns.forget_thread(thread_id)
+        return ThreadEvictionResponse(thread_id=thread_id, evicted=existed)
+
+    def get_memory_report(self, limit: int = 20, key_type: str = "lineno") -> MemoryReport:
+        if key_type not in ("lineno", "filename", "traceback"):
+            raise ValueError("key_type must be one of: lineno, filename, traceback")
+        return MemoryReport(**allocation_tracker.report(limit=limit, key_type=key_type))
+
+    def stop_memory_tracing(self) -> None:
+        allocation_tracker.stop()
+
+    def _thread_info(self, thread_id: str, size: dict) -> ThreadInfo:
+        latest = latest_checkpoint_info(self.checkpointer, thread_id)
+        return ThreadInfo(
+            thread_id=thread_id,
+            message_count=latest["message_count"],
+            checkpoint_count=size["checkpoints"],
+            approx_bytes=size["bytes"],
+            last_activity=latest["last_activity"]
+        )
@@ -0,0 +1,67 @@
+import base64
+import binascii
+import json
+from itertools import chain
+from typing import Iterator, Optional, Tuple
+from backend.schemas.arxiv import ArxivEntry, ArxivSearchPage
+from backend.tools.arxiv import ARXIV_MAX_PAGE_SIZE, ARXIV_MAX_RESULTS, iter_arxiv_results
+
+def encode_cursor(topic: str, start: int) -> str:
+    payload = json.dumps({"topic": topic, "start": start}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        topic, start = payload["topic"], int(payload["start"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(topic, str) or start < 0:
+        raise ValueError("Invalid cursor")
+    return topic, start
+
+def to_entry(paper: dict) -> ArxivEntry:
+    return ArxivEntry(
+        id=paper["id"],
+        title=" ".join((paper["title"] or "").split()),
+        authors=paper["authors"],
+        summary=" ".join(paper["summary"].split()),
+        pdf=paper["pdf"],
+        published=paper["published"],
+    )
+
+class ArxivInteractor:
+    def search(self, topic: Optional[str], limit: int, cursor: Optional[str] = None) -> ArxivSearchPage:
+        if not 1 <= limit <= ARXIV_MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {ARXIV_MAX_PAGE_SIZE}")
+        if cursor:
+            topic, start = decode_cursor(cursor)
+        elif topic:
+            start = 0
+        else:
+            raise ValueError("Either topic or cursor is required")
+
+        feed = {}
+        entries = [to_entry(paper) for paper in iter_arxiv_results(topic, limit, start=start, page_size=limit, feed=feed)]
+        end = start + len(entries)
+        total = feed.get("total_results")
+        has_more = len(entries) == limit and end < min(total if total is not None else ARXIV_MAX_RESULTS, ARXIV_MAX_RESULTS)
+        return ArxivSearchPage(
+            topic=topic,
+            start=start,
+            entries=entries,
+            total_results=total,
+            next_cursor=encode_cursor(topic, end) if has_more else None,
+        )
+
+    def stream(self, topic: str, limit: int) -> Iterator[str]:
+        if not topic:
+            raise ValueError("topic is required")
+        if not 1 <= limit <= ARXIV_MAX_RESULTS:
+            raise ValueError(f"limit must be between 1 and {ARXIV_MAX_RESULTS}")
+
+        results = iter_arxiv_results(topic, limit)
+        # Pull the first entry now so upstream failures surface as an HTTP error, not a truncated stream.
+        first = next(results, None)
+        papers = results if first is None else chain([first], results)
+        return (to_entry(paper).model_dump_json() + "\n" for paper in papers)
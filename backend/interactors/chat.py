@@ -1,14 +1,133 @@
-from backend.agents.graph import graph
+import time
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
 from backend.agents.prompts import INITIAL_PROMPT
-from backend.schemas.chat import ChatMessage, ChatResponse
-from langchain_core.messages import HumanMessage, SystemMessage
+from backend.monitoring.callbacks import metrics_callback
+from backend.monitoring.metrics import CHAT_RESPONSE_ASSEMBLY, CHAT_TURNS_IN_FLIGHT, ERRORS
+from backend.monitoring.profiling import RequestProfiler, profiling_allowed
+from backend.monitoring.recording import SessionRecorder, recording_enabled
+from backend.monitoring.tracing import TracingCallbackHandler, resolve_request_id, span, start_trace
+from backend.schemas.chat import CancelResponse, ChatMessage, ChatResponse
+from backend.services.cancellation import RunCancelled, RunHandle, runs
+from backend.services.idempotency import chat_turns
+from backend.services.prefetch import pdf_prefetcher
+from backend.services.scheduler import CapacityExceeded, Reservation, scheduler
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+def collect_turn_messages(update: dict, turn_messages: List[BaseMessage]) -> None:
+    for node_update in update.values():
+        if not node_update:
+            continue
+        for message in node_update.get("messages", []):
+            if not message.content:
+                continue
+            if isinstance(message, AIMessage):
+                if not message.content.startswith('<function=') and not 'function=' in message.content:
+                    turn_messages.append(message)
+            elif isinstance(message, ToolMessage):
+                turn_messages.append(message)
+
+def select_final_response(turn_messages: List[BaseMessage]) -> str:
+    """The latest tool result that carried an artifact, else the latest message of the turn."""
+    for message in reversed(turn_messages):
+        if isinstance(message, ToolMessage) and message.artifact:
+            return message.content
+    return turn_messages[-1].content if turn_messages else ""
+
+def select_assistant_text(turn_messages: List[BaseMessage]) -> str:
+    for message in reversed(turn_messages):
+        if isinstance(message, AIMessage):
+            return message.content
+    return ""
+
+def turn_artifacts(turn_messages: List[BaseMessage]) -> List[dict]:
+    return [message.artifact for message in turn_messages if isinstance(message, ToolMessage) and message.artifact]
+
+def close_pending_tool_calls(graph, config: dict) -> None:
+    """Answer tool calls a cancelled turn left unanswered, so the thread stays valid for the next turn."""
+    state = graph.get_state(config)
+    messages = state.values.get("messages", []) if state else []
+    if not messages or not isinstance(messages[-1], AIMessage) or not messages[-1].tool_calls:
+        return
+    graph.update_state(config, {"messages": [
+        ToolMessage(content="Cancelled by the user.", tool_call_id=call["id"], name=call["name"])
+        for call in messages[-1].tool_calls
+    ]}, as_node="tools")
 
 class ChatInteractor:
-    def process_chat(self, chat_message: ChatMessage) -> ChatResponse:
-        chat_config = {"configurable": {"thread_id": chat_message.thread_id}}
+    def process_chat(self, chat_message: ChatMessage, request_id: Optional[str] = None, profile: bool = False) -> ChatResponse:
+        request_id = resolve_request_id(request_id)
+        try:
+            if chat_message.message_id is None:
+                return self._process_turn(chat_message, request_id, profile)
+
+            # A client retry with the same message_id shares the original turn instead of running it again.
+            # Cancelled turns raise, so they are never stored as the message's answer.
+            response, outcome = chat_turns.run(
+                (chat_message.thread_id, chat_message.message_id),
+                lambda: self._process_turn(chat_message, request_id, profile)
+            )
+        except RunCancelled as e:
+            return ChatResponse(
+                response="This request was cancelled.",
+                thread_id=chat_message.thread_id,
+                request_id=request_id,
+                metadata={"cancelled": e.reason},
+            )
+        if outcome == "executed":
+            return response
+        return response.model_copy(update={"metadata": {**response.metadata, "idempotent_replay": outcome}})
+
+    def cancel(self, thread_id: str, request_id: Optional[str] = None, reason: str = "cancel_request") -> CancelResponse:
+        cancelled = runs.cancel(thread_id, request_id, reason)
+        if request_id is None:
+            pdf_prefetcher.cancel(thread_id)
+        return CancelResponse(thread_id=thread_id, cancelled=cancelled)
+
+    def _process_turn(self, chat_message: ChatMessage, request_id: str, profile: bool) -> ChatResponse:
+        with runs.start(chat_message.thread_id, request_id) as run, \
+                start_trace(request_id, chat_message.thread_id) as trace, scheduler.track_request() as usage, \
+                scheduler.reserve("model", chat_message.thread_id) as reservation:
+            # The reservation rejects or queues the turn before it touches thread state;
+            # the turn's first model call runs in the reserved slot.
+            profiler = RequestProfiler(trace) if profile and profiling_allowed() else None
+            callbacks = [metrics_callback, TracingCallbackHandler(trace)]
+            if profiler is not None:
+                callbacks.append(profiler)
+            recorder = SessionRecorder(request_id, chat_message.thread_id) if recording_enabled() else None
+            if recorder is not None:
+                callbacks.append(recorder)
+                recorder.start_turn(chat_message)
+
+            with profiler or nullcontext():
+                final_response, artifacts = self._run_turn(chat_message, callbacks, run, reservation)
+
+            if recorder is not None:
+                recorder.end_turn(final_response, artifacts)
+
+        return ChatResponse(
+            response=final_response,
+            artifacts=artifacts,
+            thread_id=chat_message.thread_id,
+            request_id=request_id,
+            metadata={
+                "queue_wait_ms": {resource: round(wait, 3) for resource, wait in usage["queue_wait_ms"].items()},
+                "rejected": usage["rejected"],
+            }
+        )
+
+    def _run_turn(self, chat_message: ChatMessage, callbacks: List, run: RunHandle, reservation: Reservation) -> Tuple[str, List[dict]]:
+        from backend.agents.graph import get_graph
+        graph = get_graph()
+
+        chat_config = {
+            "configurable": {"thread_id": chat_message.thread_id},
+            "callbacks": callbacks,
+        }
 
         try:
-            existing_state = graph.get_state(chat_config)
+            with span("graph.get_state"):
+                existing_state = graph.get_state(chat_config)
             if existing_state and existing_state.values.get("messages"):
                 messages = [HumanMessage(content=chat_message.message)]
             else:
@@ -24,47 +143,50 @@ class ChatInteractor:
         
         input_data = {"messages": messages}
         
+        CHAT_TURNS_IN_FLIGHT.inc()
         try:
-            response_stream = graph.stream(input_data, chat_config, stream_mode="values")
-            
-            final_response = ""
-            all_responses = []
-            
-            for chunk in response_stream:
-                if "messages" in chunk and chunk["messages"]:
-                    for message in chunk["messages"]:
-                        if hasattr(message, 'content') and message.content and type(message).__name__ == 'AIMessage':
-                            if not message.content.startswith('<function=') and not 'function=' in message.content:
-                                all_responses.append(message.content)
-                                final_response = message.content
-                        elif type(message).__name__ == 'ToolMessage' and hasattr(message, 'content') and message.content:
-                            all_responses.append(message.content)
-                            final_response = message.content
-            
-            if all_responses:
-                tool_result = None
-                ai_response = None
+            with span("graph.stream"):
+                # "updates" yields only what each step added, so assembly never rescans the thread history.
+                response_stream = graph.stream(input_data, chat_config, stream_mode="updates")
                 
-                for response in all_responses:
-                    if any(marker in response for marker in [
-                        "📚 Recent Papers", "## **Paper", "👥 **Authors:**", "📄 **Summary:**",
-                        "Key Contributions:", "Methodology:", "Research Directions:",
-                        "Selected Research Topics", "Paper Completed", "PDF Generated",
-                        "✅ PDF Successfully Generated", "Research Paper Generated Successfully"
-                    ]):
-                        tool_result = response
-                    else:
-                        ai_response = response
+                turn_messages = []
+                assembly_time = 0.0
                 
-                final_response = tool_result if tool_result else (ai_response or all_responses[-1])
+                try:
+                    for update in response_stream:
+                        # The first step has made (or, on a cache hit, skipped) the model call the slot was reserved for.
+                        reservation.release()
+                        # Between graph steps is where a cancelled turn stops.
+                        run.check()
+                        chunk_started = time.perf_counter()
+                        collect_turn_messages(update, turn_messages)
+                        assembly_time += time.perf_counter() - chunk_started
+                    run.check()
+                finally:
+                    response_stream.close()
             
-            if not final_response:
-                final_response = "I'm sorry, I couldn't process your request. Please try again."
+            with span("response.assembly"):
+                assembly_started = time.perf_counter()
+                artifacts = turn_artifacts(turn_messages)
+                if chat_message.response_format == "artifacts" and artifacts:
+                    # Structured clients read the artifacts; skip the tool's markdown rendering.
+                    final_response = select_assistant_text(turn_messages)
+                else:
+                    final_response = select_final_response(turn_messages)
+                    if not final_response:
+                        final_response = "I'm sorry, I couldn't process your request. Please try again."
+                CHAT_RESPONSE_ASSEMBLY.observe(assembly_time + time.perf_counter() - assembly_started)
                 
+        except CapacityExceeded:
+            raise
+        except RunCancelled:
+            close_pending_tool_calls(graph, chat_config)
+            raise
         except Exception as e:
+            ERRORS.inc(where="chat", type=type(e).__name__)
             final_response = "I encountered an error processing your request. Please try again."
+            artifacts = []
+        finally:
+            CHAT_TURNS_IN_FLIGHT.dec()
         
-        return ChatResponse(
-            response=final_response,
-            thread_id=chat_message.thread_id
-        )
\ No newline at end of file
+        return final_response, artifacts
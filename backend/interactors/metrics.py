@@ -0,0 +1,5 @@
+from backend.monitoring.metrics import registry
+
+class MetricsInteractor:
+    def get_metrics_text(self) -> str:
+        return registry.render()
@@ -0,0 +1,31 @@
+from typing import Optional
+from fastapi.responses import FileResponse
+from backend.monitoring.profiling import profile_path
+from backend.monitoring.tracing import trace_store
+from backend.schemas.traces import TraceDetail, TraceListResponse, TraceSummary
+
+class TracesInteractor:
+    def list_traces(self, thread_id: Optional[str] = None) -> TraceListResponse:
+        traces = [TraceSummary(**trace.summary()) for trace in trace_store.list(thread_id)]
+        return TraceListResponse(traces=traces, total_count=len(traces))
+
+    def get_trace(self, request_id: str) -> TraceDetail:
+        trace = trace_store.get(request_id)
+        if trace is None:
+            raise FileNotFoundError(f"No trace recorded for request {request_id}")
+        return TraceDetail(**trace.to_dict())
+
+    def get_profile_file(self, request_id: str) -> FileResponse:
+        trace = trace_store.get(request_id)
+        if trace is None or trace.profile is None:
+            raise FileNotFoundError(f"No profile recorded for request {request_id}")
+
+        path = profile_path(request_id)
+        if not path.exists():
+            raise FileNotFoundError("Profile file not found")
+
+        return FileResponse(
+            path=str(path),
+            filename=path.name,
+            media_type="application/octet-stream"
+        )
@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from backend.monitoring.metrics import ERRORS, GRAPH_NODE_DURATION, LLM_REQUEST_DURATION, LLM_TOKENS, TOOL_DURATION
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Feeds graph node, tool and chat model timings into the metrics registry."""
+
+    def __init__(self):
+        self._started: Dict[UUID, Tuple[str, str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, kind: str, name: str) -> None:
+        with self._lock:
+            self._started[run_id] = (kind, name, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[str, str, float]]:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is None:
+            return None
+        kind, name, started_at = started
+        return kind, name, time.perf_counter() - started_at
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # Nodes also run nested chains (e.g. the ToolNode internals); only time the node itself.
+        if node and kwargs.get("name") == node:
+            self._start(run_id, "node", node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            GRAPH_NODE_DURATION.observe(finished[2], node=finished[1])
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            GRAPH_NODE_DURATION.observe(finished[2], node=finished[1])
+            ERRORS.inc(where=f"node:{finished[1]}", type=type(error).__name__)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs: Any) -> None:
+        self._start(run_id, "tool", kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_DURATION.observe(finished[2], tool=finished[1])
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_DURATION.observe(finished[2], tool=finished[1])
+            ERRORS.inc(where=f"tool:{finished[1]}", type=type(error).__name__)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("name") or "unknown"
+        self._start(run_id, "llm", model)
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if not finished:
+            return
+        model = finished[1]
+        LLM_REQUEST_DURATION.observe(finished[2], model=model)
+
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    LLM_TOKENS.inc(usage.get("input_tokens", 0), model=model, kind="prompt")
+                    LLM_TOKENS.inc(usage.get("output_tokens", 0), model=model, kind="completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            LLM_REQUEST_DURATION.observe(finished[2], model=finished[1])
+            ERRORS.inc(where="llm", type=type(error).__name__)
+
+
+metrics_callback = MetricsCallbackHandler()
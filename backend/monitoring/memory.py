@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, Optional
+
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _serialized_size(value) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_serialized_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_serialized_size(item) for item in value.values())
+    return 0
+
+
+def checkpoint_sizes(checkpointer) -> Dict[str, Dict[str, int]]:
+    """Approximate serialized size of every thread held by an in-memory checkpointer.
+
+    Walks the saver's storage, blobs and pending writes once and groups the
+    serialized payload sizes by thread. Containers are copied before iterating
+    because chat turns keep writing to them concurrently.
+    """
+    sizes: Dict[str, Dict[str, int]] = defaultdict(lambda: {"bytes": 0, "checkpoints": 0})
+
+    for thread_id, namespaces in list(checkpointer.storage.items()):
+        for checkpoints in list(namespaces.values()):
+            for saved in list(checkpoints.values()):
+                sizes[thread_id]["bytes"] += _serialized_size(saved[:2])
+                sizes[thread_id]["checkpoints"] += 1
+
+    for key, blob in list(checkpointer.blobs.items()):
+        sizes[key[0]]["bytes"] += _serialized_size(blob)
+
+    for key, writes in list(checkpointer.writes.items()):
+        sizes[key[0]]["bytes"] += _serialized_size(writes)
+
+    return dict(sizes)
+
+
+def latest_checkpoint_info(checkpointer, thread_id: str) -> Dict[str, Optional[object]]:
+    checkpoint_tuple = checkpointer.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+    if checkpoint_tuple is None:
+        return {"message_count": 0, "last_activity": None}
+
+    checkpoint = checkpoint_tuple.checkpoint
+    messages = checkpoint.get("channel_values", {}).get("messages") or []
+    return {"message_count": len(messages), "last_activity": checkpoint.get("ts")}
+
+
+def configure_tracemalloc() -> None:
+    if os.getenv("TRACEMALLOC_AT_STARTUP", "").lower() in ("1", "true", "yes") and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+class AllocationTracker:
+    """Takes tracemalloc snapshots on demand and diffs each one against the previous."""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._previous_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def report(self, limit: int = 20, key_type: str = "lineno") -> dict:
+        with self._lock:
+            started_now = not tracemalloc.is_tracing()
+            if started_now:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                self._previous = None
+                self._previous_at = None
+
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            current, peak = tracemalloc.get_traced_memory()
+
+            top = [
+                {"location": self._location(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics(key_type)[:limit]
+            ]
+            diff = []
+            if self._previous is not None:
+                diff = [
+                    {
+                        "location": self._location(stat.traceback),
+                        "size_bytes": stat.size,
+                        "size_diff_bytes": stat.size_diff,
+                        "count": stat.count,
+                        "count_diff": stat.count_diff,
+                    }
+                    for stat in snapshot.compare_to(self._previous, key_type)[:limit]
+                ]
+
+            report = {
+                "tracing_started_now": started_now,
+                "traced_current_bytes": current,
+                "traced_peak_bytes": peak,
+                "previous_snapshot_at": self._previous_at,
+                "top": top,
+                "diff": diff,
+            }
+            self._previous = snapshot
+            self._previous_at = time.time()
+            return report
+
+    def stop(self) -> None:
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._previous = None
+            self._previous_at = None
+
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback) -> str:
+        frame = traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+
+allocation_tracker = AllocationTracker()
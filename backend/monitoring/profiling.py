@@ -0,0 +1,101 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from backend.monitoring.tracing import Trace
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "output/profiles")
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "25"))
+
+
+def profiling_allowed() -> bool:
+    return os.getenv("ALLOW_REQUEST_PROFILING", "").lower() in ("1", "true", "yes")
+
+
+def profile_path(request_id: str) -> Path:
+    return Path(PROFILE_DIR).absolute() / f"{request_id}.pstats"
+
+
+class RequestProfiler(BaseCallbackHandler):
+    """cProfile one chat request, including graph nodes and tools run on worker threads.
+
+    cProfile only sees the thread that enabled it, so the profiler is also a
+    callback handler: every node or tool run that starts on a thread without an
+    active profiler gets its own, and all of them are merged into one pstats dump.
+    """
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self._profiles: List[cProfile.Profile] = []
+        self._active: Dict[UUID, cProfile.Profile] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _enable(self, run_id: Optional[UUID] = None) -> None:
+        if getattr(self._local, "profile", None) is not None:
+            return
+        profile = cProfile.Profile()
+        self._local.profile = profile
+        with self._lock:
+            self._profiles.append(profile)
+            if run_id is not None:
+                self._active[run_id] = profile
+        profile.enable()
+
+    def _disable(self, run_id: Optional[UUID] = None) -> None:
+        with self._lock:
+            profile = self._active.pop(run_id, None) if run_id is not None else getattr(self._local, "profile", None)
+        if profile is not None and getattr(self._local, "profile", None) is profile:
+            profile.disable()
+            self._local.profile = None
+
+    def __enter__(self) -> "RequestProfiler":
+        self._enable()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._disable()
+        self._dump()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._enable(run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        self._disable(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._disable(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs: Any) -> None:
+        self._enable(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        self._disable(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._disable(run_id)
+
+    def _dump(self) -> None:
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+
+        path = profile_path(self.trace.request_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(str(path))
+
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        self.trace.profile = {"path": str(path), "top_cumulative": report.getvalue()}
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import ToolMessage, message_to_dict
+
+from backend.services.model_calls import classify_error, model_caller
+
+SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR", "")
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]")
+_file_locks: Dict[str, threading.Lock] = {}
+_file_locks_guard = threading.Lock()
+
+
+def recording_enabled() -> bool:
+    return bool(SESSION_RECORD_DIR)
+
+
+def recording_path(thread_id: str) -> Path:
+    return Path(SESSION_RECORD_DIR) / f"{_UNSAFE_FILENAME.sub('_', thread_id)}.jsonl"
+
+
+def _file_lock(path: Path) -> threading.Lock:
+    with _file_locks_guard:
+        return _file_locks.setdefault(str(path), threading.Lock())
+
+
+class SessionRecorder(BaseCallbackHandler):
+    """Appends one chat turn to its thread's recording in ``SESSION_RECORD_DIR``.
+
+    Each thread gets a JSON-lines file holding, in order, a ``turn`` record
+    with the incoming message, a ``model`` record per chat model response
+    (answers from the LLM cache included, marked ``cached``), a ``tool``
+    record per tool call (arguments, content, artifact or error) and a
+    ``turn_end`` record with the reply. A fast-tier answer that was escalated
+    to the large tier is followed by a ``model_discarded`` record naming its
+    run ID. ``benchmarks.replay`` plays these files back offline.
+    """
+
+    def __init__(self, request_id: str, thread_id: str):
+        self.request_id = request_id
+        self.thread_id = thread_id
+        self.path = recording_path(thread_id)
+        self._started: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+        self._turn_started_at = time.perf_counter()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        record = {"request_id": self.request_id, "ts": time.time(), **record}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.path), self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def start_turn(self, chat_message) -> None:
+        self._turn_started_at = time.perf_counter()
+        self._write({"type": "turn", "thread_id": self.thread_id, "message": chat_message.model_dump()})
+
+    def end_turn(self, response: str, artifacts: list) -> None:
+        self._write({
+            "type": "turn_end",
+            "response": response,
+            "artifacts": artifacts,
+            "duration_ms": round((time.perf_counter() - self._turn_started_at) * 1000, 3),
+        })
+
+    def _begin(self, run_id: UUID, *details) -> None:
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), *details)
+
+    def _end(self, run_id: UUID) -> Optional[tuple]:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is None:
+            return None
+        return (round((time.perf_counter() - started[0]) * 1000, 3), *started[1:])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs: Any) -> None:
+        self._begin(run_id, sum(len(batch) for batch in messages))
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        finished = self._end(run_id)
+        # Hedged or timed-out attempts whose answer wasn't used would throw replay out of step.
+        if finished is None or model_caller.is_abandoned(run_id):
+            return
+        duration_ms, message_count = finished
+        message = response.generations[0][0].message
+        self._write({
+            "type": "model",
+            "run_id": str(run_id),
+            "duration_ms": duration_ms,
+            "input_messages": message_count,
+            "response": message_to_dict(message),
+        })
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        finished = self._end(run_id)
+        if finished is not None and not model_caller.is_abandoned(run_id):
+            self._write({
+                "type": "model",
+                "run_id": str(run_id),
+                "duration_ms": finished[0],
+                "error": f"{type(error).__name__}: {error}",
+                "error_class": classify_error(error),
+            })
+
+    def on_custom_event(self, name, data, *, run_id, **kwargs: Any) -> None:
+        if name == "llm_cache_hit":
+            self._write({
+                "type": "model",
+                "duration_ms": 0.0,
+                "input_messages": data["input_messages"],
+                "response": message_to_dict(data["response"]),
+                "cached": True,
+            })
+        elif name == "model_discarded":
+            self._write({"type": "model_discarded", "run_id": data["run_id"]})
+
+    def on_tool_start(self, serialized, input_str, *, run_id, inputs=None, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._begin(run_id, name, inputs if inputs is not None else input_str)
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        finished = self._end(run_id)
+        if finished is None:
+            return
+        duration_ms, name, args = finished
+        content, artifact = output, None
+        if isinstance(output, ToolMessage):
+            content, artifact = output.content, output.artifact
+        self._write({"type": "tool", "name": name, "args": args, "duration_ms": duration_ms, "content": content, "artifact": artifact})
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        finished = self._end(run_id)
+        if finished is None:
+            return
+        duration_ms, name, args = finished
+        self._write({"type": "tool", "name": name, "args": args, "duration_ms": duration_ms, "error": f"{type(error).__name__}: {error}"})
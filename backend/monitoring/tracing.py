@@ -0,0 +1,262 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+TRACE_STORE_SIZE = int(os.getenv("TRACE_STORE_SIZE", "200"))
+SLOW_REQUEST_THRESHOLD_SECONDS = float(os.getenv("SLOW_REQUEST_THRESHOLD_SECONDS", "10"))
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, trace: "Trace", name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+
+    def child(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> "Span":
+        span = Span(self.trace, name, attributes)
+        with self.trace.lock:
+            self.children.append(span)
+        return span
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end = time.perf_counter()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def to_dict(self) -> dict:
+        with self.trace.lock:
+            children = list(self.children)
+        return {
+            "name": self.name,
+            "attributes": self.attributes,
+            "start_ms": round((self.start - self.trace.root.start) * 1000, 3),
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 3),
+            "error": self.error,
+            "children": [child.to_dict() for child in children],
+        }
+
+
+class Trace:
+    def __init__(self, request_id: str, thread_id: str, name: str):
+        self.request_id = request_id
+        self.thread_id = thread_id
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.profile: Optional[dict] = None
+        self.root = Span(self, name, {"request_id": request_id, "thread_id": thread_id})
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "thread_id": self.thread_id,
+            "started_at": self.started_at,
+            "duration_ms": None if self.root.duration is None else round(self.root.duration * 1000, 3),
+            "profile": self.profile,
+            "root": self.root.to_dict(),
+        }
+
+    def summary(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "thread_id": self.thread_id,
+            "started_at": self.started_at,
+            "duration_ms": None if self.root.duration is None else round(self.root.duration * 1000, 3),
+            "error": self.root.error,
+        }
+
+
+class TraceStore:
+    def __init__(self, max_traces: int = TRACE_STORE_SIZE):
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.request_id] = trace
+            self._traces.move_to_end(trace.request_id)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(request_id)
+
+    def list(self, thread_id: Optional[str] = None) -> List[Trace]:
+        with self._lock:
+            traces = list(self._traces.values())
+        if thread_id is not None:
+            traces = [trace for trace in traces if trace.thread_id == thread_id]
+        return list(reversed(traces))
+
+
+trace_store = TraceStore()
+
+
+def resolve_request_id(candidate: Optional[str]) -> str:
+    if candidate and _REQUEST_ID_PATTERN.match(candidate):
+        return candidate
+    return uuid.uuid4().hex
+
+
+def current_trace() -> Optional[Trace]:
+    span = _current_span.get()
+    return span.trace if span is not None else None
+
+
+@contextmanager
+def start_trace(request_id: str, thread_id: str, name: str = "chat"):
+    trace = Trace(request_id, thread_id, name)
+    token = _current_span.set(trace.root)
+    error = None
+    try:
+        yield trace
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        trace.root.finish(error)
+        trace_store.add(trace)
+        if trace.root.duration >= SLOW_REQUEST_THRESHOLD_SECONDS:
+            breakdown = ", ".join(
+                f"{child.name}={(child.duration or 0) * 1000:.0f}ms" for child in trace.root.children
+            )
+            logger.warning(
+                "Slow request %s on thread %s took %.2fs (%s)",
+                request_id, thread_id, trace.root.duration, breakdown,
+            )
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Record a child span of the current span; a no-op outside of a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = parent.child(name, attributes)
+    token = _current_span.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish(error)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Turns graph node, chat model and tool runs of one request into spans of its trace.
+
+    Tool spans also become the current span for the tool body, so spans opened
+    inside a tool (HTTP fetches, PDF parsing, compiles) nest under it.
+    """
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self._spans: Dict[UUID, Span] = {}
+        self._enclosing: Dict[UUID, Span] = {}
+        self._outer_spans: Dict[UUID, Optional[Span]] = {}
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, attributes: Dict[str, Any]) -> Span:
+        with self.trace.lock:
+            parent = (self._spans.get(parent_run_id) or self._enclosing.get(parent_run_id)) if parent_run_id else None
+        if parent is None:
+            current = _current_span.get()
+            parent = current if current is not None and current.trace is self.trace else self.trace.root
+        span = parent.child(name, attributes)
+        with self.trace.lock:
+            self._spans[run_id] = span
+        return span
+
+    def _finish(self, run_id: UUID, error: Optional[BaseException] = None) -> None:
+        with self.trace.lock:
+            span = self._spans.get(run_id)
+        if span is not None:
+            span.finish(error)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        name = kwargs.get("name")
+        if node and name == node:
+            self._start(run_id, parent_run_id, f"node:{node}", {"step": (metadata or {}).get("langgraph_step")})
+        elif parent_run_id is not None:
+            # Keep intermediate runs addressable so their children still find the enclosing span.
+            with self.trace.lock:
+                parent = self._spans.get(parent_run_id) or self._enclosing.get(parent_run_id)
+                if parent is not None:
+                    self._enclosing[run_id] = parent
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("name") or "unknown"
+        self._start(run_id, parent_run_id, "llm", {"model": model, "messages": sum(len(batch) for batch in messages)})
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        with self.trace.lock:
+            span = self._spans.get(run_id)
+        if span is not None:
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        span.attributes["prompt_tokens"] = usage.get("input_tokens", 0)
+                        span.attributes["completion_tokens"] = usage.get("output_tokens", 0)
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        span = self._start(run_id, parent_run_id, f"tool:{name}", {"tool_call_id": kwargs.get("tool_call_id")})
+        # The tool body runs in a copy of this context, so this makes it the parent of in-tool spans.
+        with self.trace.lock:
+            self._outer_spans[run_id] = _current_span.get()
+        _current_span.set(span)
+
+    def _restore_outer_span(self, run_id: UUID) -> None:
+        with self.trace.lock:
+            outer = self._outer_spans.pop(run_id, None)
+        _current_span.set(outer)
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+        self._restore_outer_span(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+        self._restore_outer_span(run_id)
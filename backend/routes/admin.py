@@ -0,0 +1,61 @@
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from backend.schemas.admin import MemoryReport, ThreadEvictionResponse, ThreadInfo, ThreadListResponse
+from backend.interactors.admin import AdminInteractor
+
+def require_admin_token(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    admin_token = os.getenv("ADMIN_TOKEN")
+    # Fail closed: without a configured token the endpoints don't exist.
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token or "", admin_token):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Token header")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+@router.get("/threads", response_model=ThreadListResponse)
+async def list_threads(limit: int = 100) -> ThreadListResponse:
+    try:
+        admin_interactor = AdminInteractor()
+        return admin_interactor.list_threads(limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing threads: {str(e)}")
+
+@router.get("/threads/{thread_id}", response_model=ThreadInfo)
+async def get_thread(thread_id: str) -> ThreadInfo:
+    try:
+        admin_interactor = AdminInteractor()
+        return admin_interactor.get_thread(thread_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading thread: {str(e)}")
+
+@router.delete("/threads/{thread_id}", response_model=ThreadEvictionResponse)
+async def evict_thread(thread_id: str) -> ThreadEvictionResponse:
+    try:
+        admin_interactor = AdminInteractor()
+        return admin_interactor.evict_thread(thread_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error evicting thread: {str(e)}")
+
+@router.get("/memory", response_model=MemoryReport)
+async def get_memory_report(limit: int = 20, key_type: str = "lineno") -> MemoryReport:
+    try:
+        admin_interactor = AdminInteractor()
+        return admin_interactor.get_memory_report(limit, key_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error taking memory snapshot: {str(e)}")
+
+@router.delete("/memory")
+async def stop_memory_tracing() -> dict:
+    try:
+        admin_interactor = AdminInteractor()
+        admin_interactor.stop_memory_tracing()
+        return {"tracing": False}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error stopping memory tracing: {str(e)}")
@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from backend.schemas.arxiv import ArxivSearchPage
+from backend.interactors.arxiv import ArxivInteractor
+
+router = APIRouter(prefix="/arxiv", tags=["arxiv"])
+
+@router.get("/search", response_model=ArxivSearchPage)
+async def search_arxiv(topic: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> ArxivSearchPage:
+    try:
+        arxiv_interactor = ArxivInteractor()
+        return await run_in_threadpool(arxiv_interactor.search, topic, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching arXiv: {str(e)}")
+
+@router.get("/search/stream")
+async def stream_arxiv_search(topic: str, limit: int = 500) -> StreamingResponse:
+    try:
+        arxiv_interactor = ArxivInteractor()
+        lines = await run_in_threadpool(arxiv_interactor.stream, topic, limit)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching arXiv: {str(e)}")
@@ -1,13 +1,49 @@
-from fastapi import APIRouter, HTTPException
-from backend.schemas.chat import ChatMessage, ChatResponse
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from backend.schemas.chat import CancelResponse, ChatMessage, ChatResponse
 from backend.interactors.chat import ChatInteractor
+from backend.monitoring.tracing import resolve_request_id
+from backend.services.scheduler import CapacityExceeded
+
+DISCONNECT_POLL_SECONDS = 0.5
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 @router.post("/", response_model=ChatResponse)
-async def chat_with_agent(chat_message: ChatMessage) -> ChatResponse:
+async def chat_with_agent(
+    chat_message: ChatMessage,
+    request: Request,
+    response: Response,
+    x_request_id: Optional[str] = Header(default=None),
+    x_profile: Optional[str] = Header(default=None),
+) -> ChatResponse:
+    try:
+        chat_interactor = ChatInteractor()
+        profile = (x_profile or "").lower() in ("1", "true", "yes")
+        request_id = resolve_request_id(x_request_id)
+        turn = asyncio.ensure_future(run_in_threadpool(
+            chat_interactor.process_chat, chat_message, request_id=request_id, profile=profile
+        ))
+        # Turns sent with a message_id outlive a disconnect so the client's retry can attach to them.
+        while chat_message.message_id is None and not turn.done():
+            await asyncio.wait({turn}, timeout=DISCONNECT_POLL_SECONDS)
+            if not turn.done() and await request.is_disconnected():
+                chat_interactor.cancel(chat_message.thread_id, request_id, reason="client_disconnected")
+                break
+        chat_response = await turn
+        response.headers["X-Request-ID"] = chat_response.request_id
+        return chat_response
+    except CapacityExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
+
+@router.post("/{thread_id}/cancel", response_model=CancelResponse)
+async def cancel_chat(thread_id: str) -> CancelResponse:
     try:
         chat_interactor = ChatInteractor()
-        return chat_interactor.process_chat(chat_message)
+        return chat_interactor.cancel(thread_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error cancelling chat: {str(e)}")
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from backend.interactors.metrics import MetricsInteractor
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    try:
+        metrics_interactor = MetricsInteractor()
+        return PlainTextResponse(metrics_interactor.get_metrics_text(), media_type="text/plain; version=0.0.4")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering metrics: {str(e)}")
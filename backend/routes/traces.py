@@ -0,0 +1,37 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from backend.schemas.traces import TraceDetail, TraceListResponse
+from backend.interactors.traces import TracesInteractor
+from backend.routes.admin import require_admin_token
+
+# Traces expose thread_ids and span attributes (queries, URLs), so they are admin-only.
+router = APIRouter(prefix="/traces", tags=["traces"], dependencies=[Depends(require_admin_token)])
+
+@router.get("/", response_model=TraceListResponse)
+async def list_traces(thread_id: Optional[str] = None) -> TraceListResponse:
+    try:
+        traces_interactor = TracesInteractor()
+        return traces_interactor.list_traces(thread_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing traces: {str(e)}")
+
+@router.get("/{request_id}", response_model=TraceDetail)
+async def get_trace(request_id: str) -> TraceDetail:
+    try:
+        traces_interactor = TracesInteractor()
+        return traces_interactor.get_trace(request_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading trace: {str(e)}")
+
+@router.get("/{request_id}/profile")
+async def download_profile(request_id: str) -> FileResponse:
+    try:
+        traces_interactor = TracesInteractor()
+        return traces_interactor.get_profile_file(request_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error downloading profile: {str(e)}")
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ThreadInfo(BaseModel):
+    thread_id: str
+    message_count: int
+    checkpoint_count: int
+    approx_bytes: int
+    last_activity: Optional[str]
+
+class ThreadListResponse(BaseModel):
+    threads: List[ThreadInfo]
+    total_count: int
+    total_bytes: int
+
+class ThreadEvictionResponse(BaseModel):
+    thread_id: str
+    evicted: bool
+
+class AllocationSite(BaseModel):
+    location: str
+    size_bytes: int
+    count: int
+
+class AllocationDiff(BaseModel):
+    location: str
+    size_bytes: int
+    size_diff_bytes: int
+    count: int
+    count_diff: int
+
+class MemoryReport(BaseModel):
+    tracing_started_now: bool
+    traced_current_bytes: int
+    traced_peak_bytes: int
+    previous_snapshot_at: Optional[float]
+    top: List[AllocationSite]
+    diff: List[AllocationDiff]
@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Union
+
+class PaperEntry(BaseModel):
+    index: int
+    title: str
+    authors: List[str]
+    summary: str
+    pdf: Optional[str] = None
+
+class SearchResultsArtifact(BaseModel):
+    kind: Literal["search_results"] = "search_results"
+    topic: str
+    papers: List[PaperEntry]
+
+class PassageExcerpt(BaseModel):
+    start: int
+    score: float
+    text: str
+
+class PaperAnalysisArtifact(BaseModel):
+    kind: Literal["paper_analysis"] = "paper_analysis"
+    url: str
+    characters: int
+    truncated: bool
+    excerpt: str
+    research_directions: List[str]
+    question: Optional[str] = None
+    passages: List[PassageExcerpt] = []
+    source: Literal["full_text", "abstract"] = "full_text"
+
+class PaperDigest(BaseModel):
+    url: str
+    title: Optional[str] = None
+    characters: int = 0
+    passages: List[PassageExcerpt] = []
+    error: Optional[str] = None
+
+class LiteratureDigestArtifact(BaseModel):
+    kind: Literal["literature_digest"] = "literature_digest"
+    question: Optional[str] = None
+    papers: List[PaperDigest]
+
+class PaperSourceArtifact(BaseModel):
+    kind: Literal["paper_source"] = "paper_source"
+    filename: str
+
+class PdfDocumentArtifact(BaseModel):
+    kind: Literal["pdf_document"] = "pdf_document"
+    filename: str
+    download_url: str
+
+Artifact = Annotated[
+    Union[SearchResultsArtifact, PaperAnalysisArtifact, LiteratureDigestArtifact, PaperSourceArtifact, PdfDocumentArtifact],
+    Field(discriminator="kind"),
+]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ArxivEntry(BaseModel):
+    id: str
+    title: str
+    authors: List[str]
+    summary: str
+    pdf: Optional[str]
+    published: Optional[str]
+
+class ArxivSearchPage(BaseModel):
+    topic: str
+    start: int
+    entries: List[ArxivEntry]
+    total_results: Optional[int]
+    next_cursor: Optional[str]
@@ -1,9 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+from backend.schemas.artifacts import Artifact
 
 class ChatMessage(BaseModel):
     message: str
     thread_id: str = "default"
+    message_id: Optional[str] = Field(default=None, min_length=1, max_length=128)
+    response_format: Literal["text", "artifacts"] = "text"
 
 class ChatResponse(BaseModel):
     response: str
-    thread_id: str
\ No newline at end of file
+    thread_id: str
+    request_id: Optional[str] = None
+    artifacts: List[Artifact] = []
+    metadata: Dict[str, Any] = {}
+
+class CancelResponse(BaseModel):
+    thread_id: str
+    cancelled: int
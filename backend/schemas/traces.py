@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+class SpanInfo(BaseModel):
+    name: str
+    attributes: Dict[str, Any]
+    start_ms: float
+    duration_ms: Optional[float]
+    error: Optional[str]
+    children: List["SpanInfo"]
+
+class ProfileInfo(BaseModel):
+    path: str
+    top_cumulative: str
+
+class TraceSummary(BaseModel):
+    request_id: str
+    thread_id: str
+    started_at: float
+    duration_ms: Optional[float]
+    error: Optional[str]
+
+class TraceDetail(BaseModel):
+    request_id: str
+    thread_id: str
+    started_at: float
+    duration_ms: Optional[float]
+    profile: Optional[ProfileInfo]
+    root: SpanInfo
+
+class TraceListResponse(BaseModel):
+    traces: List[TraceSummary]
+    total_count: int
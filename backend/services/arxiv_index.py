@@ -0,0 +1,112 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+ARXIV_INDEX_ENABLED = os.getenv("ARXIV_INDEX_ENABLED", "").lower() in ("1", "true", "yes")
+ARXIV_INDEX_PATH = os.getenv("ARXIV_INDEX_PATH", "output/cache/arxiv_index.sqlite3")
+ARXIV_INDEX_MAX_AGE_SECONDS = float(os.getenv("ARXIV_INDEX_MAX_AGE_SECONDS", "86400"))
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(topic: str) -> str:
+    """An FTS5 query requiring every word of ``topic``, each quoted so user text can't inject operators."""
+    return " ".join(f'"{term}"' for term in _TERM.findall(topic.lower()))
+
+
+class ArxivIndex:
+    """Local full-text index of every arXiv entry the app has fetched.
+
+    Entries live in a plain table keyed by arXiv id, with an FTS5 table over
+    title, summary and authors sharing its rowids. Searches return the newest
+    matches first, like the arXiv queries they stand in for (sorted by
+    submission date); ties are ranked with bm25, weighting title matches above
+    authors and authors above the summary.
+    """
+
+    def __init__(self, path: str = ARXIV_INDEX_PATH):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                "id TEXT PRIMARY KEY, entry TEXT NOT NULL, published TEXT, indexed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(title, summary, authors, tokenize='porter unicode61')"
+            )
+
+    def add(self, entries: Iterable[dict]) -> int:
+        now = time.time()
+        added = 0
+        with self._lock, self._conn:
+            for entry in entries:
+                if not entry.get("id"):
+                    continue
+                encoded = json.dumps(entry, ensure_ascii=False)
+                fields = (entry["title"] or "", entry["summary"] or "", " ".join(entry["authors"]))
+                row = self._conn.execute("SELECT rowid FROM papers WHERE id = ?", (entry["id"],)).fetchone()
+                if row is None:
+                    rowid = self._conn.execute(
+                        "INSERT INTO papers (id, entry, published, indexed_at) VALUES (?, ?, ?, ?)",
+                        (entry["id"], encoded, entry.get("published"), now),
+                    ).lastrowid
+                else:
+                    rowid = row[0]
+                    self._conn.execute(
+                        "UPDATE papers SET entry = ?, published = ?, indexed_at = ? WHERE rowid = ?",
+                        (encoded, entry.get("published"), now, rowid),
+                    )
+                    self._conn.execute("DELETE FROM papers_fts WHERE rowid = ?", (rowid,))
+                self._conn.execute("INSERT INTO papers_fts (rowid, title, summary, authors) VALUES (?, ?, ?, ?)", (rowid, *fields))
+                added += 1
+        return added
+
+    def search(self, topic: str, limit: int, max_age: Optional[float] = None) -> List[dict]:
+        """Newest ``limit`` matches for ``topic``, only among entries indexed within ``max_age`` seconds when given."""
+        expression = match_expression(topic)
+        if not expression:
+            return []
+        oldest = time.time() - max_age if max_age is not None else 0.0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT papers.entry FROM papers_fts JOIN papers ON papers.rowid = papers_fts.rowid "
+                "WHERE papers_fts MATCH ? AND papers.indexed_at >= ? "
+                "ORDER BY papers.published DESC, bm25(papers_fts, 5.0, 1.0, 2.0) LIMIT ?",
+                (expression, oldest, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM papers")
+            self._conn.execute("DELETE FROM papers_fts")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+_arxiv_index: Optional[ArxivIndex] = None
+_arxiv_index_lock = threading.Lock()
+
+
+def get_arxiv_index() -> Optional[ArxivIndex]:
+    """The process-wide index, or None unless ARXIV_INDEX_ENABLED is set."""
+    global _arxiv_index
+    if not ARXIV_INDEX_ENABLED:
+        return None
+    if _arxiv_index is None:
+        with _arxiv_index_lock:
+            if _arxiv_index is None:
+                _arxiv_index = ArxivIndex()
+    return _arxiv_index
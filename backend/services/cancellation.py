@@ -0,0 +1,135 @@
+import subprocess
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from backend.monitoring.metrics import registry
+
+RUNS_CANCELLED = registry.counter("chat_runs_cancelled_total", "Chat runs cancelled, by what asked for it.", ["reason"])
+
+_current_run: ContextVar[Optional["RunHandle"]] = ContextVar("current_run", default=None)
+
+
+class RunCancelled(Exception):
+    def __init__(self, thread_id: str, reason: str):
+        self.thread_id = thread_id
+        self.reason = reason
+        super().__init__(f"The run on thread {thread_id} was cancelled ({reason})")
+
+
+class RunHandle:
+    """Cancellation state of one chat turn, checked cooperatively by the code it runs.
+
+    Subprocesses registered with ``process`` are killed as soon as the run is
+    cancelled; everything else notices at its next ``check`` or
+    ``should_continue`` call.
+    """
+
+    def __init__(self, thread_id: str, request_id: str):
+        self.thread_id = thread_id
+        self.request_id = request_id
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._processes: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def should_continue(self) -> bool:
+        return not self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise RunCancelled(self.thread_id, self.reason or "cancelled")
+
+    def cancel(self, reason: str) -> bool:
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        RUNS_CANCELLED.inc(reason=reason)
+        return True
+
+    @contextmanager
+    def process(self, process: subprocess.Popen):
+        with self._lock:
+            cancelled = self._event.is_set()
+            if not cancelled:
+                self._processes.append(process)
+        if cancelled:
+            process.kill()
+        try:
+            yield process
+        finally:
+            with self._lock:
+                if process in self._processes:
+                    self._processes.remove(process)
+
+
+class RunRegistry:
+    """In-flight chat runs by thread_id, so a thread's runs can be cancelled from another request."""
+
+    def __init__(self):
+        self._runs: Dict[str, Dict[str, RunHandle]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start(self, thread_id: str, request_id: str):
+        run = RunHandle(thread_id, request_id)
+        with self._lock:
+            self._runs.setdefault(thread_id, {})[request_id] = run
+        token = _current_run.set(run)
+        try:
+            yield run
+        finally:
+            _current_run.reset(token)
+            with self._lock:
+                runs = self._runs.get(thread_id)
+                if runs is not None and runs.get(request_id) is run:
+                    del runs[request_id]
+                    if not runs:
+                        del self._runs[thread_id]
+
+    def cancel(self, thread_id: str, request_id: Optional[str] = None, reason: str = "cancel_request") -> int:
+        with self._lock:
+            runs = list(self._runs.get(thread_id, {}).values())
+        return sum(run.cancel(reason) for run in runs if request_id is None or run.request_id == request_id)
+
+    def active(self, thread_id: str) -> int:
+        with self._lock:
+            return len(self._runs.get(thread_id, {}))
+
+
+def current_run() -> Optional[RunHandle]:
+    return _current_run.get()
+
+
+def check_cancelled() -> None:
+    """Raise RunCancelled if the chat turn this code runs for has been cancelled."""
+    run = _current_run.get()
+    if run is not None:
+        run.check()
+
+
+def run_subprocess(args: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """``subprocess.run`` with captured text output that the current chat turn can kill."""
+    run = _current_run.get()
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+    if run is None:
+        stdout, stderr = process.communicate()
+    else:
+        with run.process(process):
+            stdout, stderr = process.communicate()
+        run.check()
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+runs = RunRegistry()
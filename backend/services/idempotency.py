@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from backend.monitoring.metrics import CACHE_REQUESTS
+from backend.services.singleflight import SingleFlight
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1000"))
+
+T = TypeVar("T")
+
+
+class IdempotencyStore(Generic[T]):
+    """Runs each idempotency key at most once and replays its result to retries.
+
+    Keys are ``(thread_id, message_id)`` pairs. A retry that arrives while the
+    first call is still running waits for it through a single-flight group; one
+    that arrives afterwards gets the stored result, which is kept for ``ttl``
+    seconds in a bounded LRU. Calls that raise are not stored, so a retry after
+    a failure runs again.
+    """
+
+    def __init__(self, name: str, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._flights = SingleFlight(name)
+        self._results: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key: Tuple[str, str], fn: Callable[[], T]) -> Tuple[T, str]:
+        """Returns the result and how it was obtained: ``executed``, ``attached`` or ``cached``."""
+        result = self.get(key)
+        if result is not None:
+            return result, "cached"
+
+        executed = False
+
+        def leader() -> T:
+            nonlocal executed
+            # The previous holder of the key may have finished between get() and do().
+            stored = self._lookup(key)
+            if stored is not None:
+                return stored
+            executed = True
+            value = fn()
+            self._store(key, value)
+            return value
+
+        result = self._flights.do(key, leader)
+        return result, "executed" if executed else "attached"
+
+    def get(self, key: Tuple[str, str]) -> Optional[T]:
+        result = self._lookup(key)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss" if result is None else "hit")
+        return result
+
+    def forget_thread(self, thread_id: str) -> int:
+        with self._lock:
+            keys = [key for key in self._results if key[0] == thread_id]
+            for key in keys:
+                del self._results[key]
+        return len(keys)
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[T]:
+        with self._lock:
+            stored = self._results.get(key)
+            if stored is None:
+                return None
+            expires_at, value = stored
+            if expires_at <= time.monotonic():
+                del self._results[key]
+                return None
+            self._results.move_to_end(key)
+            return value
+
+    def _store(self, key: Tuple[str, str], value: T) -> None:
+        with self._lock:
+            self._results[key] = (time.monotonic() + self.ttl, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+
+chat_turns: IdempotencyStore = IdempotencyStore("chat_idempotency")
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+
+from backend.monitoring.metrics import CACHE_REQUESTS
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "output/cache/llm_responses.sqlite3")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "0"))
+
+
+def _canonical_message(message: BaseMessage) -> dict:
+    # Message and tool-call ids differ on every run, so they are left out of the key.
+    canonical = {"type": message.type, "content": message.content}
+    if isinstance(message, AIMessage) and message.tool_calls:
+        canonical["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in message.tool_calls]
+    if getattr(message, "name", None):
+        canonical["name"] = message.name
+    return canonical
+
+
+def cache_key(messages: List[BaseMessage], fingerprint: dict) -> str:
+    """sha256 of the canonical message list plus the model fingerprint (provider, params, bound tools)."""
+    payload = {"model": fingerprint, "messages": [_canonical_message(message) for message in messages]}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Exact-match cache of model responses in a local SQLite file.
+
+    Entries are evicted least-recently-used once there are more than
+    ``max_entries``, and ignored after ``ttl`` seconds when a TTL is set.
+    Responses come back with fresh message and tool-call ids so a replayed
+    answer never collides with one already in a thread.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: float = LLM_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_last_used ON llm_responses (last_used_at)")
+
+    def get(self, key: str) -> Optional[AIMessage]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl > 0 and row[1] + self.ttl <= now:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._conn.execute("UPDATE llm_responses SET last_used_at = ?, hits = hits + 1 WHERE key = ?", (now, key))
+
+        CACHE_REQUESTS.inc(cache="llm", result="miss" if row is None else "hit")
+        if row is None:
+            return None
+        return self._fresh_copy(messages_from_dict([json.loads(row[0])])[0])
+
+    def put(self, key: str, response: AIMessage) -> None:
+        if not response.content and not response.tool_calls:
+            return
+        now = time.time()
+        encoded = json.dumps(message_to_dict(response), ensure_ascii=False, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, created_at, last_used_at, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, encoded, now, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN (SELECT key FROM llm_responses ORDER BY last_used_at LIMIT ?)",
+                    (overflow,),
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    @staticmethod
+    def _fresh_copy(message: AIMessage) -> AIMessage:
+        tool_calls = [{**call, "id": f"call_{uuid.uuid4().hex}"} for call in message.tool_calls]
+        return message.model_copy(update={"id": None, "tool_calls": tool_calls})
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """The process-wide cache, or None unless LLM_CACHE_ENABLED is set."""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache()
+    return _llm_cache
@@ -0,0 +1,284 @@
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from langchain_core.exceptions import (
+    ContextOverflowError,
+    ModelAPIError,
+    ModelAuthenticationError,
+    ModelConnectionError,
+    ModelInvalidRequestError,
+    ModelNotFoundError,
+    ModelPermissionDeniedError,
+    ModelRateLimitError,
+    ModelTimeoutError,
+)
+
+from backend.monitoring.metrics import registry
+from backend.services.cancellation import RunCancelled, check_cancelled
+from backend.services.scheduler import CANCEL_POLL_SECONDS, scheduler
+
+MODEL_CALL_TIMEOUT_SECONDS = float(os.getenv("MODEL_CALL_TIMEOUT_SECONDS", "120"))
+MODEL_CALL_BUDGET_SECONDS = float(os.getenv("MODEL_CALL_BUDGET_SECONDS", "180"))
+MODEL_MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", "2"))
+MODEL_RETRY_BACKOFF_SECONDS = float(os.getenv("MODEL_RETRY_BACKOFF_SECONDS", "1"))
+MODEL_HEDGE_PERCENTILE = float(os.getenv("MODEL_HEDGE_PERCENTILE", "0"))
+MODEL_HEDGE_MIN_SAMPLES = int(os.getenv("MODEL_HEDGE_MIN_SAMPLES", "20"))
+MODEL_CALL_WORKERS = int(os.getenv("MODEL_CALL_WORKERS", "32"))
+
+MODEL_CALL_ATTEMPTS = registry.counter("model_call_attempts_total", "Chat model attempts by kind (first, hedge or retry).", ["kind"])
+MODEL_CALL_ERRORS = registry.counter("model_call_errors_total", "Failed chat model calls by error class.", ["error"])
+MODEL_HEDGES = registry.counter("model_call_hedges_total", "Hedged model calls by which attempt answered first, or skipped when no attempt slot was free.", ["result"])
+
+ERROR_CLASSES = (
+    (ModelTimeoutError, "timeout"),
+    (TimeoutError, "timeout"),
+    (ModelRateLimitError, "rate_limited"),
+    (ModelConnectionError, "connection"),
+    (ConnectionError, "connection"),
+    (ContextOverflowError, "invalid_request"),
+    (ModelInvalidRequestError, "invalid_request"),
+    (ModelAuthenticationError, "auth"),
+    (ModelPermissionDeniedError, "auth"),
+    (ModelNotFoundError, "invalid_request"),
+    (ModelAPIError, "server"),
+)
+RETRYABLE_ERRORS = frozenset({"timeout", "rate_limited", "connection", "server"})
+ABANDONED_RUNS_KEPT = 1024
+
+
+class ModelDeadlineExceeded(TimeoutError):
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        super().__init__(f"The model did not answer within {timeout:g}s")
+
+
+def classify_error(error: BaseException) -> str:
+    """Coarse class of a failed model call; only the RETRYABLE_ERRORS classes are retried."""
+    while error is not None:
+        for error_type, name in ERROR_CLASSES:
+            if isinstance(error, error_type):
+                return name
+        error = error.__cause__
+    return "other"
+
+
+class LatencyWindow:
+    """Latencies of the most recent model attempts, for the hedging threshold."""
+
+    def __init__(self, size: int = 500):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def samples(self) -> List[float]:
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class ModelCaller:
+    """Invokes the chat model with a per-attempt deadline, hedging and bounded retries.
+
+    With hedging on, a second identical request is sent once the first has run
+    longer than the ``hedge_percentile`` of recent attempt latencies, and
+    whichever answers first is used. Latencies are tracked per ``key`` (e.g.
+    the model tier), so slow and fast models each hedge at their own threshold.
+    Attempts run on worker threads; ones that lose the race or miss the
+    deadline can't be interrupted, so they finish in the background and their
+    run IDs are marked abandoned for the session recorder to skip. Failures
+    classified as retryable are retried up to ``max_retries`` times with
+    exponential backoff, all within one ``budget`` of seconds per call.
+
+    Every attempt still running, abandoned or not, holds one of
+    ``max_in_flight`` slots (by default the scheduler's model concurrency), so
+    hedges and retries never put more requests upstream than the model cap
+    allows: a hedge is skipped when no slot is free, and a first attempt or
+    retry waits for one.
+    """
+
+    def __init__(
+        self,
+        timeout: float = MODEL_CALL_TIMEOUT_SECONDS,
+        budget: float = MODEL_CALL_BUDGET_SECONDS,
+        max_retries: int = MODEL_MAX_RETRIES,
+        backoff: float = MODEL_RETRY_BACKOFF_SECONDS,
+        hedge_percentile: float = MODEL_HEDGE_PERCENTILE,
+        hedge_min_samples: int = MODEL_HEDGE_MIN_SAMPLES,
+        workers: int = MODEL_CALL_WORKERS,
+        max_in_flight: Optional[int] = None,
+    ):
+        self.timeout = timeout
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_in_flight = max_in_flight or scheduler.pools["model"].limit
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self._in_flight = 0
+        self._slots = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-call")
+        self._abandoned: Dict[UUID, None] = {}
+        self._lock = threading.Lock()
+
+    def latency_window(self, key: str) -> LatencyWindow:
+        with self._lock:
+            return self.latencies.setdefault(key, LatencyWindow())
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        if self.hedge_percentile <= 0:
+            return None
+        return self.latency_window(key).percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    def is_abandoned(self, run_id: UUID) -> bool:
+        with self._lock:
+            return run_id in self._abandoned
+
+    def invoke(self, model, messages, key: str = "default"):
+        return self.invoke_with_run_id(model, messages, key)[0]
+
+    def invoke_with_run_id(self, model, messages, key: str = "default") -> Tuple[Any, UUID]:
+        """Like ``invoke``, also returning the run ID of the attempt whose answer is used."""
+        # One budget covers every attempt and backoff, so retries can't stretch a call to (max_retries + 1) timeouts.
+        budget_deadline = time.monotonic() + self.budget if self.budget > 0 else None
+        retries = 0
+        while True:
+            try:
+                return self._call(model, messages, "retry" if retries else "first", key, budget_deadline)
+            except RunCancelled:
+                raise
+            except Exception as e:
+                error = classify_error(e)
+                MODEL_CALL_ERRORS.inc(error=error)
+                if error not in RETRYABLE_ERRORS or retries >= self.max_retries:
+                    raise
+                backoff = self.backoff * 2 ** retries
+                if budget_deadline is not None and time.monotonic() + backoff >= budget_deadline:
+                    raise
+            self._sleep(backoff)
+            retries += 1
+
+    def _call(self, model, messages, kind: str, key: str, budget_deadline: Optional[float] = None) -> Tuple[Any, UUID]:
+        latencies = self.latency_window(key)
+        if self.timeout <= 0 and self.hedge_percentile <= 0 and budget_deadline is None:
+            run_id = uuid4()
+            return self._attempt(model, messages, kind, run_id, latencies), run_id
+
+        started = time.monotonic()
+        deadline, limit = (started + self.timeout, self.timeout) if self.timeout > 0 else (None, None)
+        if budget_deadline is not None and (deadline is None or budget_deadline < deadline):
+            deadline, limit = budget_deadline, self.budget
+        hedge_delay = self.hedge_delay(key)
+        hedge_at = started + hedge_delay if hedge_delay is not None else None
+        self._take_slot(deadline, limit)
+        attempts = {self._submit(model, messages, kind, latencies): kind}
+        pending = set(attempts)
+        error = None
+        while True:
+            now = time.monotonic()
+            timeout = min(t for t in (now + CANCEL_POLL_SECONDS, deadline, hedge_at) if t is not None) - now
+            done, pending = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                self._abandon(other for other in attempts if other is not future)
+                if len(attempts) > 1:
+                    MODEL_HEDGES.inc(result="hedge" if attempts[future] == "hedge" else "first")
+                return response, future.run_id
+            if not pending:
+                raise error
+
+            try:
+                check_cancelled()
+            except RunCancelled:
+                self._abandon(pending)
+                raise
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                self._abandon(pending)
+                raise ModelDeadlineExceeded(limit)
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if not self._try_take_slot():
+                    MODEL_HEDGES.inc(result="skipped")
+                    continue
+                hedge = self._submit(model, messages, "hedge", latencies)
+                attempts[hedge] = "hedge"
+                pending.add(hedge)
+
+    def _take_slot(self, deadline: Optional[float], limit: Optional[float]) -> None:
+        with self._slots:
+            while self._in_flight >= self.max_in_flight:
+                check_cancelled()
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    raise ModelDeadlineExceeded(limit)
+                self._slots.wait(min(CANCEL_POLL_SECONDS, deadline - now) if deadline is not None else CANCEL_POLL_SECONDS)
+            self._in_flight += 1
+
+    def _try_take_slot(self) -> bool:
+        with self._slots:
+            if self._in_flight >= self.max_in_flight:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _give_back_slot(self, future: Future) -> None:
+        with self._slots:
+            self._in_flight -= 1
+            self._slots.notify()
+
+    def _submit(self, model, messages, kind: str, latencies: LatencyWindow) -> Future:
+        """Run one attempt on a worker; the caller has taken its slot, which the attempt holds until it finishes."""
+        run_id = uuid4()
+        # The copied context carries the graph's callbacks, the trace and the current run into the worker.
+        context = contextvars.copy_context()
+        future = self._pool.submit(context.run, self._attempt, model, messages, kind, run_id, latencies)
+        future.run_id = run_id
+        future.add_done_callback(self._give_back_slot)
+        return future
+
+    def _attempt(self, model, messages, kind: str, run_id: UUID, latencies: LatencyWindow):
+        MODEL_CALL_ATTEMPTS.inc(kind=kind)
+        started = time.perf_counter()
+        response = model.invoke(messages, {"run_id": run_id})
+        latencies.add(time.perf_counter() - started)
+        return response
+
+    def _abandon(self, futures) -> None:
+        with self._lock:
+            for future in futures:
+                self._abandoned[future.run_id] = None
+            while len(self._abandoned) > ABANDONED_RUNS_KEPT:
+                del self._abandoned[next(iter(self._abandoned))]
+
+    def _sleep(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        while True:
+            check_cancelled()
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, CANCEL_POLL_SECONDS))
+
+
+model_caller = ModelCaller()
@@ -0,0 +1,109 @@
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import List, NamedTuple
+
+from backend.services.pdf_text import PDF_TEXT_CACHE_SIZE, normalize_pdf_url
+
+PASSAGE_CHARS = int(os.getenv("PASSAGE_CHARS", "400"))
+PASSAGE_TOP_K = int(os.getenv("PASSAGE_TOP_K", "3"))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a about above after all also an and any are as at be been being between both but by can could did do does "
+    "for from had has have how if in into is it its more most no not of on or other our over paper such than that "
+    "the their them then there these they this those through to under up use used using was we were what when where "
+    "which while who why will with would".split()
+)
+
+
+class Passage(NamedTuple):
+    start: int
+    text: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def split_passages(text: str, size: int = PASSAGE_CHARS) -> List[tuple]:
+    """Cut ``text`` into windows of about ``size`` characters as ``(offset, text)``, ending at a sentence or line break where possible."""
+    passages, start = [], 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            floor = start + size * 2 // 3
+            cut = max(text.rfind(". ", floor, end), text.rfind("\n", floor, end))
+            if cut != -1:
+                end = cut + 1
+        chunk = " ".join(text[start:end].split())
+        if chunk:
+            passages.append((start, chunk))
+        start = end
+    return passages
+
+
+class PassageIndex:
+    """BM25 ranking over fixed-size passages of one document."""
+
+    def __init__(self, text: str, size: int = PASSAGE_CHARS, k1: float = 1.5, b: float = 0.75):
+        self.length = len(text)
+        self.passages = split_passages(text, size)
+        self.k1, self.b = k1, b
+        self._term_counts = [Counter(tokenize(chunk)) for _, chunk in self.passages]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        document_frequency = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        total = len(self.passages)
+        self._idf = {term: math.log(1 + (total - n + 0.5) / (n + 0.5)) for term, n in document_frequency.items()}
+
+    def search(self, question: str, k: int = PASSAGE_TOP_K) -> List[Passage]:
+        """The ``k`` best passages for ``question`` in document order; the opening passages when nothing matches."""
+        terms = [term for term in set(tokenize(question)) if term in self._idf]
+        scored = []
+        for position, counts in enumerate(self._term_counts):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / (self._average_length or 1))
+            for term in terms:
+                frequency = counts.get(term)
+                if frequency:
+                    score += self._idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            if score > 0:
+                scored.append((score, position))
+
+        if not scored:
+            return [Passage(start, chunk, 0.0) for start, chunk in self.passages[:k]]
+        best = sorted(scored, reverse=True)[:k]
+        return [Passage(self.passages[position][0], self.passages[position][1], score) for score, position in sorted(best, key=lambda item: item[1])]
+
+
+class PassageIndexCache:
+    """Indexes of recently read papers, keyed like the PDF text cache."""
+
+    def __init__(self, max_entries: int = PDF_TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, text: str) -> PassageIndex:
+        key = normalize_pdf_url(url)
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None and index.length == len(text):
+                self._entries.move_to_end(key)
+                return index
+        index = PassageIndex(text)
+        with self._lock:
+            self._entries[key] = index
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+
+passage_indexes = PassageIndexCache()
@@ -0,0 +1,123 @@
+import importlib.util
+import threading
+from abc import ABC, abstractmethod
+import io
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "auto").lower()
+PDF_EXTRACTOR_RESULTS = os.getenv("PDF_EXTRACTOR_RESULTS", "output/cache/pdf_extractors.json")
+
+logger = logging.getLogger(__name__)
+
+# PDFium is not thread-safe; pypdfium2 asks callers to serialise every call into it.
+_pdfium_lock = threading.Lock()
+
+
+class PdfExtractor(ABC):
+    """One PDF text-extraction backend; ``module`` is what has to be importable for it to be available."""
+
+    name = ""
+    module = ""
+    package = ""
+
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    @abstractmethod
+    def extract(self, data: bytes) -> str:
+        """The text of the PDF in ``data``, pages separated by newlines."""
+
+
+class PyPDF2Extractor(PdfExtractor):
+    name = "pypdf2"
+    module = "PyPDF2"
+    package = "PyPDF2"
+
+    def extract(self, data: bytes) -> str:
+        import PyPDF2
+
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+        return text
+
+
+class PdfiumExtractor(PdfExtractor):
+    name = "pypdfium2"
+    module = "pypdfium2"
+    package = "pypdfium2"
+
+    def extract(self, data: bytes) -> str:
+        import pypdfium2
+
+        # read_pdfs, the prefetcher and the pdf scheduler pool all extract concurrently.
+        with _pdfium_lock:
+            document = pypdfium2.PdfDocument(data)
+            try:
+                pages = []
+                for page in document:
+                    text_page = page.get_textpage()
+                    pages.append(text_page.get_text_range().replace("\r\n", "\n") + "\n")
+                    text_page.close()
+                    page.close()
+                return "".join(pages)
+            finally:
+                document.close()
+
+
+class PdfMinerExtractor(PdfExtractor):
+    name = "pdfminer"
+    module = "pdfminer"
+    package = "pdfminer.six"
+
+    def extract(self, data: bytes) -> str:
+        from pdfminer.high_level import extract_text
+
+        return extract_text(io.BytesIO(data))
+
+
+EXTRACTORS: Dict[str, PdfExtractor] = {
+    extractor.name: extractor for extractor in (PdfiumExtractor(), PyPDF2Extractor(), PdfMinerExtractor())
+}
+
+# Used when no benchmark results are stored: pdfium (C++) is far faster than the
+# pure-Python backends, and pdfminer trades speed for layout analysis.
+DEFAULT_PREFERENCE = ("pypdfium2", "pypdf2", "pdfminer")
+
+
+def available_extractors() -> List[str]:
+    return [name for name, extractor in EXTRACTORS.items() if extractor.available()]
+
+
+def load_ranking(path: str = PDF_EXTRACTOR_RESULTS) -> Optional[List[str]]:
+    """Backend names, best first, as stored by ``python -m benchmarks.pdf_extractors --save``."""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))["ranking"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def select_extractor(name: str = PDF_EXTRACTOR) -> PdfExtractor:
+    available = available_extractors()
+    if name != "auto":
+        if name not in EXTRACTORS:
+            raise ValueError(f"Unknown PDF_EXTRACTOR {name!r}; expected 'auto' or one of {', '.join(EXTRACTORS)}.")
+        if name not in available:
+            raise ValueError(f"PDF_EXTRACTOR {name!r} is not installed (pip install {EXTRACTORS[name].package}).")
+        return EXTRACTORS[name]
+
+    ranking = load_ranking() or []
+    for candidate in [*ranking, *DEFAULT_PREFERENCE]:
+        if candidate in available:
+            logger.info("Using PDF extractor %s (%s)", candidate, "benchmarked" if candidate in ranking else "default order")
+            return EXTRACTORS[candidate]
+    raise RuntimeError("No PDF extraction backend is installed; install PyPDF2.")
+
+
+pdf_extractor = select_extractor()
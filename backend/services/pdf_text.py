@@ -0,0 +1,112 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import requests
+
+from backend.monitoring.metrics import CACHE_REQUESTS
+from backend.monitoring.tracing import span
+from backend.services.pdf_extractors import pdf_extractor
+from backend.services.singleflight import SingleFlight
+
+PDF_TEXT_CACHE_SIZE = int(os.getenv("PDF_TEXT_CACHE_SIZE", "32"))
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+class DownloadAborted(Exception):
+    pass
+
+
+def normalize_pdf_url(url: str) -> str:
+    key = url.strip().rstrip("/")
+    if key.startswith("https://"):
+        key = "http://" + key[len("https://"):]
+    if key.endswith(".pdf"):
+        key = key[:-len(".pdf")]
+    return key
+
+
+class PdfTextCache:
+    def __init__(self, max_entries: int = PDF_TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[str]:
+        key = normalize_pdf_url(url)
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(cache="pdf_text", result="miss" if text is None else "hit")
+        return text
+
+    def peek(self, url: str) -> Optional[str]:
+        with self._lock:
+            return self._entries.get(normalize_pdf_url(url))
+
+    def put(self, url: str, text: str) -> None:
+        key = normalize_pdf_url(url)
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return normalize_pdf_url(url) in self._entries
+
+
+pdf_text_cache = PdfTextCache()
+pdf_fetches = SingleFlight("pdf_fetch")
+
+
+def download_pdf(url: str, should_continue: Optional[Callable[[], bool]] = None) -> bytes:
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if should_continue is not None and not should_continue():
+                raise DownloadAborted(f"Download of {url} was aborted")
+            buffer.write(chunk)
+            if buffer.tell() > PDF_MAX_BYTES:
+                raise ValueError(f"PDF at {url} exceeds {PDF_MAX_BYTES} bytes")
+        return buffer.getvalue()
+
+
+def extract_pdf_text(data: bytes) -> str:
+    return pdf_extractor.extract(data)
+
+
+def _download_and_extract(url: str, should_continue: Optional[Callable[[], bool]]) -> str:
+    # Another caller may have finished the same fetch between our cache miss and now.
+    text = pdf_text_cache.peek(url)
+    if text is not None:
+        return text
+
+    with span("http.get", url=url) as download_span:
+        data = download_pdf(url, should_continue)
+        if download_span is not None:
+            download_span.attributes["bytes"] = len(data)
+    with span("pdf.parse", extractor=pdf_extractor.name):
+        text = extract_pdf_text(data)
+    pdf_text_cache.put(url, text)
+    return text
+
+
+def fetch_pdf_text(url: str, should_continue: Optional[Callable[[], bool]] = None) -> str:
+    text = pdf_text_cache.get(url)
+    if text is not None:
+        return text
+
+    # Concurrent readers of the same PDF share one download and one parse.
+    while True:
+        try:
+            return pdf_fetches.do(normalize_pdf_url(url), lambda: _download_and_extract(url, should_continue))
+        except DownloadAborted:
+            if should_continue is not None and not should_continue():
+                raise
+            # The shared download was aborted by the caller that started it; start our own.
@@ -0,0 +1,107 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from backend.services.pdf_text import fetch_pdf_text, normalize_pdf_url, pdf_text_cache
+
+PDF_PREFETCH_WORKERS = int(os.getenv("PDF_PREFETCH_WORKERS", "2"))
+PDF_PREFETCH_BUDGET = int(os.getenv("PDF_PREFETCH_BUDGET", "1"))
+
+
+class _PrefetchJob:
+    def __init__(self, url: str):
+        self.url = url
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class PdfPrefetcher:
+    """Warms the PDF text cache for papers a thread is likely to open next.
+
+    ``summarize_paper`` schedules the paper it summarized, since reading it in
+    depth is the usual next step; searches schedule nothing, so a search that
+    ends in abstracts only downloads no PDFs. Prefetches run on a small
+    dedicated pool so they never compete with the request path for more than a
+    couple of threads, and each thread may have at most ``budget`` of them
+    queued or running. A new search or summary on the thread, or reading a
+    paper, cancels whatever is still pending.
+    """
+
+    def __init__(self, max_workers: int = PDF_PREFETCH_WORKERS, budget: int = PDF_PREFETCH_BUDGET):
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-prefetch")
+        self._jobs: Dict[str, Dict[str, _PrefetchJob]] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, thread_id: str, urls: Iterable[Optional[str]]) -> int:
+        self.cancel(thread_id)
+        if self.budget <= 0:
+            return 0
+
+        scheduled = 0
+        with self._lock:
+            jobs = self._jobs.setdefault(thread_id, {})
+            for url in urls:
+                if scheduled >= self.budget:
+                    break
+                if not url or url in pdf_text_cache:
+                    continue
+                key = normalize_pdf_url(url)
+                if key in jobs:
+                    continue
+                job = _PrefetchJob(url)
+                job.future = self._executor.submit(self._run, thread_id, key, job)
+                jobs[key] = job
+                scheduled += 1
+        return scheduled
+
+    def claim(self, thread_id: str, url: str) -> None:
+        """Keep the prefetch of ``url`` running and cancel the thread's other prefetches.
+
+        A prefetch that has not started yet is dropped as well, since the caller
+        is about to fetch the PDF itself; one already downloading is joined
+        through the shared fetch in ``fetch_pdf_text``.
+        """
+        key = normalize_pdf_url(url)
+        with self._lock:
+            jobs = self._jobs.pop(thread_id, {})
+        claimed = jobs.pop(key, None)
+        for job in jobs.values():
+            job.cancel()
+        if claimed is not None and claimed.future is not None:
+            claimed.future.cancel()
+
+    def cancel(self, thread_id: str) -> None:
+        with self._lock:
+            jobs = self._jobs.pop(thread_id, {})
+        for job in jobs.values():
+            job.cancel()
+
+    def pending(self, thread_id: str) -> int:
+        with self._lock:
+            return len(self._jobs.get(thread_id, {}))
+
+    def _run(self, thread_id: str, key: str, job: _PrefetchJob) -> Optional[str]:
+        try:
+            if job.cancelled.is_set():
+                return None
+            return fetch_pdf_text(job.url, should_continue=lambda: not job.cancelled.is_set())
+        except Exception:
+            # Prefetching is best effort; the foreground read_pdf reports real errors.
+            return None
+        finally:
+            with self._lock:
+                jobs = self._jobs.get(thread_id)
+                if jobs is not None and jobs.get(key) is job:
+                    del jobs[key]
+                    if not jobs:
+                        del self._jobs[thread_id]
+
+
+pdf_prefetcher = PdfPrefetcher()
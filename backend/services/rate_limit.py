@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from backend.monitoring.metrics import registry
+
+ARXIV_MIN_INTERVAL_SECONDS = float(os.getenv("ARXIV_MIN_INTERVAL_SECONDS", "3"))
+ARXIV_BURST = int(os.getenv("ARXIV_BURST", "1"))
+
+RATE_LIMIT_WAIT_SECONDS = registry.counter("rate_limit_wait_seconds_total", "Seconds callers spent waiting for an outbound request slot, by host.", ["host"])
+
+
+class RateLimiter:
+    """Token bucket per host: one request every ``interval`` seconds, up to ``burst`` back to back.
+
+    ``acquire`` reserves the caller's slot under the lock and sleeps outside
+    it, so concurrent callers queue up in arrival order without holding each
+    other up any longer than the rate requires. An ``interval`` of 0 disables
+    limiting.
+
+    Buckets live in process memory, so the limit holds per server process:
+    with several workers the combined rate is that many times higher, and
+    ``interval`` has to be multiplied by the worker count to stay within an
+    upstream quota.
+    """
+
+    def __init__(self, interval: float, burst: int = 1):
+        self.interval = interval
+        self.burst = max(1, burst)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> float:
+        if self.interval <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (self.burst, now))
+            # Tokens go negative while callers are queued; each one waits for its own refill.
+            tokens = min(self.burst, tokens + (now - updated) / self.interval) - 1
+            self._buckets[host] = (tokens, now)
+        wait = -tokens * self.interval if tokens < 0 else 0.0
+
+        if wait:
+            RATE_LIMIT_WAIT_SECONDS.inc(wait, host=host)
+            time.sleep(wait)
+        return wait
+
+
+# arXiv asks API clients for no more than one request every three seconds.
+arxiv_rate_limiter = RateLimiter(ARXIV_MIN_INTERVAL_SECONDS, ARXIV_BURST)
@@ -0,0 +1,202 @@
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from backend.monitoring.metrics import registry
+from backend.services.cancellation import check_cancelled
+
+SCHEDULER_ACTIVE = registry.gauge("scheduler_active", "Slots currently held per scheduled resource.", ["resource"])
+SCHEDULER_WAITING = registry.gauge("scheduler_waiting", "Callers queued per scheduled resource.", ["resource"])
+SCHEDULER_QUEUE_WAIT = registry.histogram("scheduler_queue_wait_seconds", "Time spent queued for a scheduled resource.", ["resource"])
+SCHEDULER_REJECTIONS = registry.counter("scheduler_rejections_total", "Requests rejected because a resource queue was full.", ["resource", "reason"])
+
+CANCEL_POLL_SECONDS = 0.5
+
+_request_usage: ContextVar[Optional[dict]] = ContextVar("scheduler_request_usage", default=None)
+_reservations: ContextVar[Dict[str, "Reservation"]] = ContextVar("scheduler_reservations", default={})
+
+
+class CapacityExceeded(Exception):
+    def __init__(self, resource: str, retry_after: int, reason: str = "queue_full"):
+        self.resource = resource
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"The server is at capacity for {resource} requests; retry in {retry_after}s")
+
+
+class ResourcePool:
+    """Global and per-thread concurrency limit for one resource, with a bounded wait queue."""
+
+    def __init__(self, name: str, limit: int, per_thread_limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.per_thread_limit = per_thread_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._active = 0
+        self._active_by_thread: Dict[str, int] = defaultdict(int)
+        self._waiting = 0
+        self._avg_hold = 1.0
+
+    def _can_run(self, thread_id: str) -> bool:
+        return self._active < self.limit and self._active_by_thread[thread_id] < self.per_thread_limit
+
+    def retry_after(self) -> int:
+        # Rough time for the queue ahead of a new caller to drain through the pool.
+        return max(1, min(60, math.ceil(self._avg_hold * (self._waiting + 1) / self.limit)))
+
+    @contextmanager
+    def acquire(self, thread_id: str):
+        started_at = self._take(thread_id)
+        try:
+            yield
+        finally:
+            self._give_back(thread_id, started_at)
+
+    def _take(self, thread_id: str) -> float:
+        queued_at = time.monotonic()
+        with self._cond:
+            if not self._can_run(thread_id):
+                if self._waiting >= self.max_queue:
+                    SCHEDULER_REJECTIONS.inc(resource=self.name, reason="queue_full")
+                    raise CapacityExceeded(self.name, self.retry_after())
+
+                self._waiting += 1
+                SCHEDULER_WAITING.set(self._waiting, resource=self.name)
+                try:
+                    deadline = queued_at + self.max_wait
+                    while not self._can_run(thread_id):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            SCHEDULER_REJECTIONS.inc(resource=self.name, reason="wait_timeout")
+                            raise CapacityExceeded(self.name, self.retry_after(), reason="wait_timeout")
+                        # Wake up periodically so a cancelled turn leaves the queue instead of waiting its turn.
+                        self._cond.wait(min(remaining, CANCEL_POLL_SECONDS))
+                        check_cancelled()
+                finally:
+                    self._waiting -= 1
+                    SCHEDULER_WAITING.set(self._waiting, resource=self.name)
+
+            self._active += 1
+            self._active_by_thread[thread_id] += 1
+            SCHEDULER_ACTIVE.set(self._active, resource=self.name)
+
+        started_at = time.monotonic()
+        waited = started_at - queued_at
+        SCHEDULER_QUEUE_WAIT.observe(waited, resource=self.name)
+        usage = _request_usage.get()
+        if usage is not None:
+            usage["queue_wait_ms"][self.name] = usage["queue_wait_ms"].get(self.name, 0.0) + waited * 1000
+        return started_at
+
+    def _give_back(self, thread_id: str, started_at: float) -> None:
+        with self._cond:
+            self._active -= 1
+            self._active_by_thread[thread_id] -= 1
+            if not self._active_by_thread[thread_id]:
+                del self._active_by_thread[thread_id]
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - started_at)
+            SCHEDULER_ACTIVE.set(self._active, resource=self.name)
+            self._cond.notify_all()
+
+
+class Reservation:
+    """A slot taken before a request touches any state, handed to the request's first ``acquire``.
+
+    The slot is given back when that acquire finishes, or by ``release`` if
+    the request never asks for it.
+    """
+
+    def __init__(self, pool: ResourcePool, thread_id: str):
+        self.pool = pool
+        self.thread_id = thread_id
+        self._started_at = pool._take(thread_id)
+        self._held = True
+        self._claimed = False
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if not self._held or self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        self.pool._give_back(self.thread_id, self._started_at)
+
+
+def _pool_from_env(name: str, limit: int, per_thread_limit: int, max_queue: int, max_wait: float) -> ResourcePool:
+    prefix = f"SCHEDULER_{name.upper()}"
+    return ResourcePool(
+        name,
+        limit=int(os.getenv(f"{prefix}_CONCURRENCY", str(limit))),
+        per_thread_limit=int(os.getenv(f"{prefix}_PER_THREAD", str(per_thread_limit))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+        max_wait=float(os.getenv(f"{prefix}_MAX_WAIT", str(max_wait))),
+    )
+
+
+class Scheduler:
+    def __init__(self):
+        self.pools = {
+            "model": _pool_from_env("model", limit=8, per_thread_limit=1, max_queue=32, max_wait=20.0),
+            "pdf": _pool_from_env("pdf", limit=4, per_thread_limit=4, max_queue=16, max_wait=20.0),
+            "compile": _pool_from_env("compile", limit=2, per_thread_limit=1, max_queue=4, max_wait=60.0),
+        }
+
+    @contextmanager
+    def acquire(self, resource: str, thread_id: Optional[str]):
+        reservation = _reservations.get().get(resource)
+        if reservation is not None and reservation.claim():
+            try:
+                yield
+            finally:
+                reservation.release()
+            return
+        with self.pools[resource].acquire(thread_id or "default"):
+            yield
+
+    @contextmanager
+    def reserve(self, resource: str, thread_id: Optional[str]):
+        """Take a ``resource`` slot now, for the enclosed request's first ``acquire`` of it.
+
+        Rejections and queueing then happen before the request changes any
+        state, instead of halfway through it.
+        """
+        reservation = Reservation(self.pools[resource], thread_id or "default")
+        token = _reservations.set({**_reservations.get(), resource: reservation})
+        try:
+            yield reservation
+        finally:
+            _reservations.reset(token)
+            reservation.release()
+
+    @contextmanager
+    def track_request(self):
+        """Collect queue wait times of everything the enclosed request schedules."""
+        usage = {"queue_wait_ms": {}, "rejected": []}
+        token = _request_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _request_usage.reset(token)
+
+
+def record_rejection(error: CapacityExceeded) -> None:
+    usage = _request_usage.get()
+    if usage is not None and error.resource not in usage["rejected"]:
+        usage["rejected"].append(error.resource)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, TypeVar
+
+from backend.monitoring.metrics import registry
+
+SINGLEFLIGHT_CALLS = registry.counter("singleflight_calls_total", "Calls through a single-flight group, by whether they ran or joined an in-flight call.", ["group", "result"])
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapses concurrent calls that share a key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is still
+    running wait for and share its result (or exception). Nothing is cached
+    once the call finishes.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(group=self.group, result="collapsed")
+            return future.result()
+
+        SINGLEFLIGHT_CALLS.inc(group=self.group, result="executed")
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def collapsed(self) -> int:
+        return int(SINGLEFLIGHT_CALLS.value(group=self.group, result="collapsed"))
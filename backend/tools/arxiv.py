@@ -1,49 +1,236 @@
+import contextvars
+import io
+import os
+import re
 import requests
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
+from backend.monitoring.metrics import CACHE_REQUESTS
+from backend.monitoring.tracing import span
+from backend.schemas.artifacts import PaperEntry, SearchResultsArtifact
+from backend.services.arxiv_index import ARXIV_INDEX_MAX_AGE_SECONDS, get_arxiv_index
+from backend.services.cancellation import RunCancelled, check_cancelled
+from backend.services.prefetch import pdf_prefetcher
+from backend.services.rate_limit import arxiv_rate_limiter
+from backend.services.singleflight import SingleFlight
+
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "http://export.arxiv.org/api/query")
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+# arXiv caps a single request at 2000 entries and a query at 30000.
+ARXIV_MAX_PAGE_SIZE = 2000
+ARXIV_MAX_RESULTS = 30000
+ARXIV_BATCH_MAX_TOPICS = int(os.getenv("ARXIV_BATCH_MAX_TOPICS", "8"))
+ARXIV_CONNECT_TIMEOUT_SECONDS = float(os.getenv("ARXIV_CONNECT_TIMEOUT_SECONDS", "10"))
+ARXIV_READ_TIMEOUT_SECONDS = float(os.getenv("ARXIV_READ_TIMEOUT_SECONDS", "30"))
+
+# "paper 12", "the 3rd paper", "second paper": the user is picking from results, not naming a topic.
+PAPER_SELECTION = re.compile(
+    r"\binterested in paper\b|\bpaper\s*#?\d+\b"
+    r"|\b(?:\d+(?:st|nd|rd|th)|first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth|last)\s+paper\b"
+)
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+arxiv_searches = SingleFlight("arxiv_search")
+
+def build_query(topic: str) -> str:
+    return "+".join(topic.lower().replace("(", "").replace(")", "").replace('"', "").split())
+
 def search_arxiv_papers(topic: str, max_results: int = 5) -> dict:
-    query = topic.lower().replace(" ", "+").replace("(", "").replace(")", "").replace('"', "")
-    
+    query = build_query(topic)
+    index = get_arxiv_index()
+    if index is not None:
+        with span("arxiv.index.search"):
+            entries = index.search(topic, max_results, ARXIV_INDEX_MAX_AGE_SECONDS)
+        CACHE_REQUESTS.inc(cache="arxiv_index", result="hit" if len(entries) >= max_results else "miss")
+        if len(entries) >= max_results:
+            return {"entries": entries}
+
+    while True:
+        try:
+            # Users searching the same topic at the same time share one upstream request.
+            return arxiv_searches.do((query, max_results), lambda: _fetch_arxiv_papers(query, max_results))
+        except RunCancelled:
+            # The shared request belonged to a turn that was cancelled; start our own unless ours was too.
+            check_cancelled()
+        except Exception:
+            if index is None:
+                raise
+            # arXiv is down or failing: answer from whatever the index has, however old.
+            entries = index.search(topic, max_results)
+            if not entries:
+                raise
+            CACHE_REQUESTS.inc(cache="arxiv_index", result="stale")
+            return {"entries": entries}
+
+def search_arxiv_topics(topics: List[str], max_results: int = 5) -> Tuple[List[dict], Dict[str, str]]:
+    """Search several topics concurrently and merge the results in topic order.
+
+    Papers found under more than one topic are kept once, under the first.
+    Returns the merged entries and an error message per topic that failed.
+    """
+    with ThreadPoolExecutor(max_workers=len(topics), thread_name_prefix="arxiv-batch") as pool:
+        # Each search runs in a copy of the caller's context so its spans land in the request trace.
+        futures = [pool.submit(contextvars.copy_context().run, search_arxiv_papers, topic, max_results) for topic in topics]
+
+    merged, seen, errors = [], set(), {}
+    for topic, future in zip(topics, futures):
+        try:
+            entries = future.result()["entries"]
+        except RunCancelled:
+            raise
+        except Exception as e:
+            errors[topic] = str(e)
+            continue
+        for entry in entries:
+            key = re.sub(r"v\d+$", "", entry["id"]) or entry["pdf"] or entry["title"]
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(entry)
+    return merged, errors
+
+def _fetch_arxiv_papers(query: str, max_results: int) -> dict:
+    resp = _request_arxiv_page(query, 0, max_results)
+    with resp, span("arxiv.parse"):
+        entries = list(iter_arxiv_feed(resp.raw))
+    _index_entries(entries)
+    return {"entries": entries}
+
+def _index_entries(entries: List[dict]) -> None:
+    index = get_arxiv_index()
+    if index is not None and entries:
+        with span("arxiv.index.add", entries=len(entries)):
+            index.add(entries)
+
+def iter_arxiv_results(topic: str, limit: int, start: int = 0, page_size: int = ARXIV_PAGE_SIZE, feed: Optional[dict] = None) -> Iterator[dict]:
+    """Yield up to ``limit`` results for ``topic`` from ``start``, one page request at a time.
+
+    Entries come out as they are parsed, so callers can use the first ones
+    while the rest of the page is still downloading. ``feed`` receives the
+    feed's ``total_results`` once the first page has been read.
+    """
+    query = build_query(topic)
+    feed = {} if feed is None else feed
+    position, end = start, min(start + limit, ARXIV_MAX_RESULTS)
+    while position < end:
+        page = []
+        with _request_arxiv_page(query, position, min(page_size, ARXIV_MAX_PAGE_SIZE, end - position)) as resp:
+            for entry in iter_arxiv_feed(resp.raw, feed):
+                page.append(entry)
+                yield entry
+        _index_entries(page)
+        received = len(page)
+        position += received
+        # An empty page means the query is exhausted (or arXiv gave up early); stop instead of spinning.
+        if received == 0 or position >= feed.get("total_results", end):
+            return
+
+def _request_arxiv_page(query: str, start: int, max_results: int) -> requests.Response:
     url = (
-        "http://export.arxiv.org/api/query"
+        f"{ARXIV_API_URL}"
         f"?search_query=all:{query}"
+        f"&start={start}"
         f"&max_results={max_results}"
         "&sortBy=submittedDate"
         "&sortOrder=descending"
     )
-    
-    resp = requests.get(url)
+
+    host = urlsplit(ARXIV_API_URL).netloc
+    with span("ratelimit.wait", host=host):
+        arxiv_rate_limiter.acquire(host)
+    check_cancelled()
+    with span("http.get", host=host, query=query, start=start):
+        # Streamed, so the body is parsed as it arrives instead of being buffered whole. The read
+        # timeout bounds each wait for more bytes, so a stalled feed fails over to the index too.
+        resp = requests.get(url, stream=True, timeout=(ARXIV_CONNECT_TIMEOUT_SECONDS, ARXIV_READ_TIMEOUT_SECONDS))
     if not resp.ok:
+        resp.close()
         raise ValueError(f"Bad response from arXiv API: {resp.status_code}")
-    
-    return parse_arxiv_xml(resp.text)
+    resp.raw.decode_content = True
+    return resp
+
 def parse_arxiv_xml(xml_content: str) -> dict:
+    return {"entries": list(iter_arxiv_feed(io.BytesIO(xml_content.encode("utf-8"))))}
+
+def iter_arxiv_feed(source, feed: Optional[dict] = None) -> Iterator[dict]:
+    """Parse an arXiv Atom feed from a file-like ``source`` incrementally.
+
+    Each entry is yielded as soon as its closing tag is read and then dropped
+    from the tree, so memory stays flat however long the feed is.
+    """
+    events = ET.iterparse(source, events=("start", "end"))
+    _, root = next(events)
+    for event, elem in events:
+        if event != "end":
+            continue
+        if elem.tag == f"{ATOM}entry":
+            yield _parse_entry(elem)
+            root.clear()
+        elif elem.tag == f"{OPENSEARCH}totalResults" and feed is not None:
+            feed["total_results"] = int(elem.text)
+
+def _parse_entry(entry: ET.Element) -> dict:
+    authors = [author.findtext(f"{ATOM}name") for author in entry.iterfind(f"{ATOM}author")]
+
+    pdf_link = None
+    for link in entry.iterfind(f"{ATOM}link"):
+        if link.attrib.get("type") == "application/pdf":
+            pdf_link = link.attrib.get("href")
+            break
+
+    return {
+        "id": (entry.findtext(f"{ATOM}id") or "").rsplit("/abs/", 1)[-1],
+        "title": entry.findtext(f"{ATOM}title"),
+        "summary": entry.findtext(f"{ATOM}summary").strip(),
+        "authors": authors,
+        "pdf": pdf_link,
+        "published": entry.findtext(f"{ATOM}published"),
+    }
+
+def format_search_results(topic: str, papers: list) -> tuple:
+    formatted_papers = f"# 📚 **Recent Papers on {topic.title()}**\n\n"
+    formatted_papers += f"Found **{len(papers)} papers** from arXiv:\n\n"
     entries = []
-    ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
-    root = ET.fromstring(xml_content)
-    
-    for entry in root.findall("atom:entry", ns):
-        authors = [author.findtext("atom:name", namespaces=ns) for author in entry.findall("atom:author", ns)]
-        
-        pdf_link = None
-        for link in entry.findall("atom:link", ns):
-            if link.attrib.get("type") == "application/pdf":
-                pdf_link = link.attrib.get("href")
-                break
-
-        entries.append({
-            "title": entry.findtext("atom:title", namespaces=ns),
-            "summary": entry.findtext("atom:summary", namespaces=ns).strip(),
-            "authors": authors,
-            "pdf": pdf_link
-        })
 
-    return {"entries": entries}
+    for i, paper in enumerate(papers, 1):
+        title = paper['title'].strip().replace('\n', ' ').replace('  ', ' ')
+
+        authors = paper['authors'][:3]
+        author_text = ', '.join(authors)
+        if len(paper['authors']) > 3:
+            author_text += f" and {len(paper['authors']) - 3} others"
+
+        summary = paper['summary'].strip().replace('\n', ' ').replace('  ', ' ')
+        entries.append(PaperEntry(index=i, title=title, authors=paper['authors'], summary=summary, pdf=paper['pdf']))
+        if len(summary) > 300:
+            summary = summary[:300] + "..."
+
+        formatted_papers += f"## **Paper {i}: {title}**\n\n"
+        formatted_papers += f"👥 **Authors:** {author_text}\n\n"
+        formatted_papers += f"📄 **Summary:** {summary}\n\n"
+        formatted_papers += f"🔗 **PDF:** [Download Paper]({paper['pdf']})\n\n"
+        formatted_papers += "---\n\n"
+
+    formatted_papers += "## 🎯 **Next Step**\n\n"
+    formatted_papers += "**Which paper are you interested in?** You can say:\n"
+    for i in range(1, min(len(papers), 5) + 1):
+        formatted_papers += f"- \"I am interested in paper {i}\"\n"
+    if len(papers) > 5:
+        formatted_papers += f"- or any other paper number up to {len(papers)}\n"
+    formatted_papers += "\n"
+
+    return formatted_papers, SearchResultsArtifact(topic=topic, papers=entries).model_dump()
 
 
-@tool
-def arxiv_search(topic: str) -> str:
+@tool(response_format="content_and_artifact")
+def arxiv_search(topic: str, config: RunnableConfig) -> tuple:
     """Search for recently uploaded arXiv papers
 
     Args:
@@ -53,45 +240,66 @@ def arxiv_search(topic: str) -> str:
         Formatted string with paper information including titles, authors, summaries, etc.
     """
     try:
-        topic_lower = topic.lower()
-        if any(phrase in topic_lower for phrase in ["interested in paper", "paper 1", "paper 2", "paper 3", "paper 4", "paper 5", "1st paper", "2nd paper", "3rd paper", "4th paper", "5th paper", "first paper", "second paper", "third paper", "fourth paper", "fifth paper"]):
-            return "ERROR: This appears to be a paper selection request. Please use read_pdf tool instead of arxiv_search for analyzing specific papers."
+        if PAPER_SELECTION.search(topic.lower()):
+            return "ERROR: This appears to be a paper selection request. Please use read_pdf tool instead of arxiv_search for analyzing specific papers.", None
 
         papers = search_arxiv_papers(topic)
 
         if len(papers['entries']) == 0:
-            return f"📚 No recent papers found for topic: {topic}\n\nTry a different search term or let me know if you'd like to explore a related topic."
+            return f"📚 No recent papers found for topic: {topic}\n\nTry a different search term or let me know if you'd like to explore a related topic.", SearchResultsArtifact(topic=topic, papers=[]).model_dump()
 
-        formatted_papers = f"# 📚 **Recent Papers on {topic.title()}**\n\n"
-        formatted_papers += f"Found **{len(papers['entries'])} papers** from arXiv:\n\n"
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if thread_id:
+            # PDFs are prefetched once a paper is picked, not for every result; drop any left from earlier results.
+            pdf_prefetcher.cancel(thread_id)
 
-        for i, paper in enumerate(papers['entries'], 1):
-            title = paper['title'].strip().replace('\n', ' ').replace('  ', ' ')
+        return format_search_results(topic, papers['entries'])
+
+    except RunCancelled:
+        raise
+    except Exception as e:
+        return f"❌ Error searching for papers on {topic}: {str(e)}\n\nPlease try a different search term.", None
+
+
+@tool(response_format="content_and_artifact")
+def arxiv_batch_search(topics: List[str], config: RunnableConfig) -> tuple:
+    """Search arXiv for several topics at once and return one combined list of papers
+
+    Args:
+        topics: The topics to search for papers about, e.g. ["Graph Theory", "Combinatorics"]
+
+    Returns:
+        Formatted string with the merged, deduplicated papers from all topics
+    """
+    try:
+        unique_topics = list(dict.fromkeys(topic.strip() for topic in topics if topic.strip()))
+        if not unique_topics:
+            return "ERROR: No topics given. Pass the subtopics to search as a list.", None
+        skipped = unique_topics[ARXIV_BATCH_MAX_TOPICS:]
+        unique_topics = unique_topics[:ARXIV_BATCH_MAX_TOPICS]
 
-            authors = paper['authors'][:3]
-            author_text = ', '.join(authors)
-            if len(paper['authors']) > 3:
-                author_text += f" and {len(paper['authors']) - 3} others"
+        papers, errors = search_arxiv_topics(unique_topics)
+        label = ", ".join(unique_topics)
 
-            summary = paper['summary'].strip().replace('\n', ' ').replace('  ', ' ')
-            if len(summary) > 300:
-                summary = summary[:300] + "..."
+        notes = ""
+        if errors:
+            notes += "⚠️ **Could not search:** " + "; ".join(f"{topic} ({error})" for topic, error in errors.items()) + "\n\n"
+        if skipped:
+            notes += f"⚠️ **Only the first {ARXIV_BATCH_MAX_TOPICS} topics were searched;** skipped: {', '.join(skipped)}\n\n"
 
-            formatted_papers += f"## **Paper {i}: {title}**\n\n"
-            formatted_papers += f"👥 **Authors:** {author_text}\n\n"
-            formatted_papers += f"📄 **Summary:** {summary}\n\n"
-            formatted_papers += f"🔗 **PDF:** [Download Paper]({paper['pdf']})\n\n"
-            formatted_papers += "---\n\n"
+        if len(papers) == 0:
+            if len(errors) == len(unique_topics):
+                return f"❌ Error searching for papers on {label}.\n\n{notes}Please try different search terms.", None
+            return f"📚 No recent papers found for topics: {label}\n\n{notes}Try different search terms or let me know if you'd like to explore related topics.", SearchResultsArtifact(topic=label, papers=[]).model_dump()
 
-        formatted_papers += "## 🎯 **Next Step**\n\n"
-        formatted_papers += "**Which paper are you interested in?** You can say:\n"
-        formatted_papers += "- \"I am interested in paper 1\"\n"
-        formatted_papers += "- \"I am interested in paper 2\"\n"
-        formatted_papers += "- \"I am interested in paper 3\"\n"
-        formatted_papers += "- \"I am interested in paper 4\"\n"
-        formatted_papers += "- \"I am interested in paper 5\"\n\n"
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if thread_id:
+            pdf_prefetcher.cancel(thread_id)
 
-        return formatted_papers
+        content, artifact = format_search_results(label, papers)
+        return notes + content, artifact
 
+    except RunCancelled:
+        raise
     except Exception as e:
-        return f"❌ Error searching for papers on {topic}: {str(e)}\n\nPlease try a different search term."
+        return f"❌ Error searching for papers on {', '.join(topics)}: {str(e)}\n\nPlease try different search terms.", None
@@ -2,14 +2,14 @@ from langchain_core.tools import tool
 from datetime import datetime
 import re
 
-@tool
+@tool(response_format="content_and_artifact")
 def generate_comprehensive_paper(
     title: str,
     research_area: str,
     key_findings: str,
     methodology_description: str,
     related_papers_summary: str = ""
-) -> str:
+) -> tuple:
     """Generate a comprehensive, professional research paper with detailed content for all sections.
 
     This creates a 16-18 page research paper with extensive content, mathematical formulations,
@@ -47,10 +47,8 @@ def generate_comprehensive_paper(
         conclusion=conclusion
     )
 
-    from backend.tools.write import write_research_paper
-    result = write_research_paper(paper_content)
-
-    return result
+    from backend.tools.write import save_research_paper
+    return save_research_paper(paper_content)
 
 def generate_detailed_abstract(title: str, research_area: str, key_findings: str) -> str:
     """Generate a comprehensive abstract (250-300 words) for professional research paper."""
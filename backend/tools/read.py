@@ -1,43 +1,50 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, List, Optional
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-import io
-import PyPDF2
-import requests
+from langgraph.prebuilt import InjectedState
 
-@tool
-def read_pdf(url: str) -> str:
-    """Read and extract text from a PDF file given its URL.
+from backend.monitoring.tracing import span
+from backend.schemas.artifacts import LiteratureDigestArtifact, PaperAnalysisArtifact, PaperDigest, PassageExcerpt
+from backend.services.passages import PASSAGE_TOP_K, passage_indexes
+from backend.services.cancellation import RunCancelled, check_cancelled, current_run
+from backend.services.pdf_text import DownloadAborted, fetch_pdf_text, normalize_pdf_url, pdf_text_cache
+from backend.services.prefetch import pdf_prefetcher
+from backend.services.scheduler import CapacityExceeded, scheduler
 
-    Args:
-        url: The URL of the PDF file to read
+READ_PDFS_MAX_PAPERS = int(os.getenv("READ_PDFS_MAX_PAPERS", "8"))
+READ_PDFS_WORKERS = int(os.getenv("READ_PDFS_WORKERS", "4"))
+DIGEST_PASSAGES = 2
 
-    Returns:
-        A structured summary of the PDF content for analysis
-    """
-    try:
-        response = requests.get(url)
-        pdf_file = io.BytesIO(response.content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+RESEARCH_DIRECTIONS = [
+    ("Advanced Methodologies", "Improving current approaches"),
+    ("Cross-Domain Applications", "Applying concepts to new fields"),
+    ("Performance Optimization", "Enhancing efficiency and accuracy"),
+    ("Theoretical Foundations", "Strengthening mathematical basis"),
+    ("Practical Implementation", "Real-world deployment strategies"),
+]
 
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+SEARCH_TOOLS = ("arxiv_search", "arxiv_batch_search")
 
-        if len(text) > 8000:
-            text = text[:8000] + "\n\n[Content truncated for analysis...]"
-        
-        analysis = f"""# 📖 **Paper Summary**
+# Used when the user has no specific question: pulls the passages stating what the paper does and finds.
+DEFAULT_QUESTION = "main contribution proposed method approach experiments key results findings conclusion limitations future work"
 
-## 📄 **Summary:**
-{text[:1000]}...
+def format_paper_analysis(heading: str, body: str) -> str:
+    directions = "\n".join(
+        f"{i}. **{name}** - {description}" for i, (name, description) in enumerate(RESEARCH_DIRECTIONS, 1)
+    )
+    return f"""# 📖 **Paper Summary**
+
+## 📄 **{heading}**
+{body}
 
 ## 🔬 **Key Research Directions:**
 Based on this paper, here are potential research directions:
 
-1. **Advanced Methodologies** - Improving current approaches
-2. **Cross-Domain Applications** - Applying concepts to new fields  
-3. **Performance Optimization** - Enhancing efficiency and accuracy
-4. **Theoretical Foundations** - Strengthening mathematical basis
-5. **Practical Implementation** - Real-world deployment strategies
+{directions}
 
 ---
 
@@ -48,7 +55,164 @@ You can say:
 - "Choose best topics for me"
 - "I will decide myself"
 """
-        
-        return analysis
+
+def last_search_results(messages: list) -> Optional[dict]:
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage) and message.name in SEARCH_TOOLS and message.artifact:
+            return message.artifact
+    return None
+
+@tool(response_format="content_and_artifact")
+def summarize_paper(paper_number: int, config: RunnableConfig, state: Annotated[dict, InjectedState]) -> tuple:
+    """Quickly analyze a paper from the last search using its arXiv abstract, without downloading the PDF.
+
+    Args:
+        paper_number: The paper's number in the last search results (1 for the first paper)
+
+    Returns:
+        A structured summary of the paper based on its abstract
+    """
+    results = last_search_results(state["messages"])
+    if results is None:
+        return "ERROR: There are no search results in this conversation yet. Search with arxiv_search first, or use read_pdf with the paper's URL.", None
+    papers = results["papers"]
+    if not 0 < paper_number <= len(papers):
+        return f"ERROR: The last search returned {len(papers)} papers; choose a paper between 1 and {len(papers)}.", None
+
+    paper = papers[paper_number - 1]
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if thread_id:
+        # Asking to read this paper in depth is the likely next step; start downloading its PDF only.
+        pdf_prefetcher.schedule(thread_id, [paper["pdf"]])
+    authors = ", ".join(paper["authors"][:3]) + (f" and {len(paper['authors']) - 3} others" if len(paper["authors"]) > 3 else "")
+    body = f"**{paper['title']}**\n\n👥 {authors}\n\n{paper['summary']}\n\n*Based on the arXiv abstract. Ask to read the paper in depth for its full text.*"
+
+    artifact = PaperAnalysisArtifact(
+        url=paper["pdf"] or "",
+        characters=len(paper["summary"]),
+        truncated=False,
+        excerpt=paper["summary"][:1000],
+        research_directions=[name for name, _ in RESEARCH_DIRECTIONS],
+        source="abstract",
+    )
+    return format_paper_analysis("Abstract", body), artifact.model_dump()
+
+def _read_text(url: str, thread_id: Optional[str]) -> str:
+    if url in pdf_text_cache:
+        return fetch_pdf_text(url)
+    run = current_run()
+    try:
+        with scheduler.acquire("pdf", thread_id):
+            # A cancelled turn aborts its download at the next chunk.
+            return fetch_pdf_text(url, should_continue=run.should_continue if run is not None else None)
+    except DownloadAborted:
+        check_cancelled()
+        raise
+
+@tool(response_format="content_and_artifact")
+def read_pdf(url: str, config: RunnableConfig, question: Optional[str] = None) -> tuple:
+    """Read a paper's full PDF given its URL and return the passages most relevant to a question.
+
+    Downloads and parses the whole PDF, so it is slower than summarize_paper; use it when the user wants depth.
+
+    Args:
+        url: The URL of the PDF file to read
+        question: What the user wants to know about the paper; leave empty for a general overview
+
+    Returns:
+        A structured summary of the PDF content for analysis
+    """
+    try:
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if thread_id:
+            pdf_prefetcher.claim(thread_id, url)
+
+        text = _read_text(url, thread_id)
+        characters = len(text)
+        with span("pdf.passages", characters=characters):
+            passages = passage_indexes.get(url, text).search(question or DEFAULT_QUESTION, PASSAGE_TOP_K)
+
+        excerpts = "\n\n".join(
+            f"**[~{passage.start * 100 // max(characters, 1)}% into the paper]** {passage.text}" for passage in passages
+        )
+        heading = f"Passages relevant to: {question}" if question else "Key Passages"
+        analysis = format_paper_analysis(heading, excerpts)
+
+        artifact = PaperAnalysisArtifact(
+            url=url,
+            characters=characters,
+            truncated=sum(len(passage.text) for passage in passages) < characters,
+            excerpt=text[:1000],
+            research_directions=[name for name, _ in RESEARCH_DIRECTIONS],
+            question=question,
+            passages=[PassageExcerpt(start=p.start, score=round(p.score, 3), text=p.text) for p in passages],
+        )
+        return analysis, artifact.model_dump()
+    except (CapacityExceeded, RunCancelled):
+        raise
     except Exception as e:
-        raise Exception(f"Error reading PDF: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error reading PDF: {str(e)}")
+
+def _digest_paper(url: str, title: Optional[str], question: str, thread_id: Optional[str]) -> PaperDigest:
+    text = _read_text(url, thread_id)
+    passages = passage_indexes.get(url, text).search(question, DIGEST_PASSAGES)
+    return PaperDigest(
+        url=url,
+        title=title,
+        characters=len(text),
+        passages=[PassageExcerpt(start=p.start, score=round(p.score, 3), text=p.text) for p in passages],
+    )
+
+@tool(response_format="content_and_artifact")
+def read_pdfs(urls: List[str], config: RunnableConfig, state: Annotated[dict, InjectedState], question: Optional[str] = None) -> tuple:
+    """Read several papers' PDFs at once and return a short digest of each, e.g. for a related-work section.
+
+    Args:
+        urls: The URLs of the PDF files to read
+        question: What to look for in every paper; leave empty for each paper's contributions and results
+
+    Returns:
+        One digest per paper with its most relevant passages
+    """
+    unique_urls = list(dict.fromkeys(url.strip() for url in urls if url.strip()))[:READ_PDFS_MAX_PAPERS]
+    if not unique_urls:
+        return "ERROR: No paper URLs given. Pass the PDF links of the papers to read as a list.", None
+
+    titles = {}
+    for message in state["messages"]:
+        if isinstance(message, ToolMessage) and message.name in SEARCH_TOOLS and message.artifact:
+            titles.update({normalize_pdf_url(paper["pdf"]): paper["title"] for paper in message.artifact["papers"] if paper["pdf"]})
+
+    thread_id = config.get("configurable", {}).get("thread_id")
+    # Papers are fetched concurrently; the "pdf" scheduler pool still bounds how many download at once.
+    with ThreadPoolExecutor(max_workers=min(len(unique_urls), READ_PDFS_WORKERS), thread_name_prefix="read-pdfs") as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, _digest_paper, url, titles.get(normalize_pdf_url(url)), question or DEFAULT_QUESTION, thread_id)
+            for url in unique_urls
+        ]
+
+    digests, errors = [], []
+    for url, future in zip(unique_urls, futures):
+        try:
+            digests.append(future.result())
+        except RunCancelled:
+            raise
+        except Exception as e:
+            errors.append(e)
+            digests.append(PaperDigest(url=url, title=titles.get(normalize_pdf_url(url)), error=str(e)))
+    if len(errors) == len(unique_urls):
+        if isinstance(errors[0], CapacityExceeded):
+            raise errors[0]
+        raise Exception(f"Error reading PDFs: {errors[0]}")
+
+    sections = []
+    for i, digest in enumerate(digests, 1):
+        heading = f"## **Paper {i}: {digest.title or digest.url}**\n\n🔗 {digest.url}\n\n"
+        if digest.error:
+            sections.append(heading + f"❌ Could not read this paper: {digest.error}")
+        else:
+            sections.append(heading + "\n\n".join(f"- {passage.text}" for passage in digest.passages))
+
+    focus = f" — {question}" if question else ""
+    content = f"# 📚 **Literature Digest ({len(digests)} papers){focus}**\n\n" + "\n\n---\n\n".join(sections) + "\n"
+    return content, LiteratureDigestArtifact(question=question, papers=digests).model_dump()
@@ -1,10 +1,16 @@
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from datetime import datetime
 from pathlib import Path
-import subprocess
 import shutil
 import re
 
+from backend.monitoring.metrics import LATEX_COMPILE_DURATION
+from backend.monitoring.tracing import span
+from backend.schemas.artifacts import PaperSourceArtifact, PdfDocumentArtifact
+from backend.services.cancellation import RunCancelled, run_subprocess
+from backend.services.scheduler import CapacityExceeded, scheduler
+
 def validate_and_fix_latex(latex_content: str) -> str:
     fixed_content = latex_content
     
@@ -54,8 +60,8 @@ def validate_and_fix_latex(latex_content: str) -> str:
     
     return fixed_content
 
-@tool
-def write_research_paper(paper_content: str) -> str:
+@tool(response_format="content_and_artifact")
+def write_research_paper(paper_content: str) -> tuple:
     """Write a comprehensive research paper in professional LaTeX format and save it to a file.
     
     This tool generates professional, 8+ page research papers with proper academic structure,
@@ -71,29 +77,32 @@ def write_research_paper(paper_content: str) -> str:
         Confirmation message with the saved file path
     """
     try:
-        output_dir = Path("output").absolute()
-        output_dir.mkdir(exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        tex_filename = f"paper_{timestamp}.tex"
-        tex_file = output_dir / tex_filename
-        
-        enhanced_content = enhance_paper_content(paper_content)
-        
-        validated_content = validate_and_fix_latex(enhanced_content)
-        
-        tex_file.write_text(validated_content, encoding='utf-8')
-        
-        return f"## ✅ Research Paper Generated Successfully!\n\n**📄 Paper Features:**\n• Professional academic formatting\n• Comprehensive 8+ page structure\n• Mathematical formulations and equations\n• Tables and figures support\n• Proper citations and references\n\n**📁 File saved:** `{tex_filename}`\n\n**🔄 Next Step:** Ask me to **'generate PDF'** to create the final PDF document!"
-        
+        return save_research_paper(paper_content)
     except Exception as e:
         raise Exception(f"Error writing paper: {str(e)}")
 
+def save_research_paper(paper_content: str) -> tuple:
+    output_dir = Path("output").absolute()
+    output_dir.mkdir(exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    tex_filename = f"paper_{timestamp}.tex"
+    tex_file = output_dir / tex_filename
+    
+    enhanced_content = enhance_paper_content(paper_content)
+    
+    validated_content = validate_and_fix_latex(enhanced_content)
+    
+    tex_file.write_text(validated_content, encoding='utf-8')
+    
+    message = f"## ✅ Research Paper Generated Successfully!\n\n**📄 Paper Features:**\n• Professional academic formatting\n• Comprehensive 8+ page structure\n• Mathematical formulations and equations\n• Tables and figures support\n• Proper citations and references\n\n**📁 File saved:** `{tex_filename}`\n\n**🔄 Next Step:** Ask me to **'generate PDF'** to create the final PDF document!"
+    return message, PaperSourceArtifact(filename=tex_filename).model_dump()
+
 def enhance_paper_content(content: str) -> str:
     return content
 
-@tool
-def render_latex_pdf(latex_content: str = None) -> str:
+@tool(response_format="content_and_artifact")
+def render_latex_pdf(config: RunnableConfig, latex_content: str = None) -> tuple:
     """Render a LaTeX document to PDF.
 
     Args:
@@ -114,7 +123,7 @@ def render_latex_pdf(latex_content: str = None) -> str:
         if not latex_content or not latex_content.strip():
             tex_files = list(output_dir.glob("paper_*.tex"))
             if not tex_files:
-                return "Error: No LaTeX content provided and no existing .tex files found. Please generate a paper first."
+                return "Error: No LaTeX content provided and no existing .tex files found. Please generate a paper first.", None
             
             most_recent_tex = max(tex_files, key=lambda f: f.stat().st_mtime)
             latex_content = most_recent_tex.read_text(encoding='utf-8')
@@ -130,12 +139,10 @@ def render_latex_pdf(latex_content: str = None) -> str:
         
         pdf_filename = tex_filename.replace('.tex', '.pdf')
 
-        result = subprocess.run(
-            ["tectonic", tex_filename, "--outdir", str(output_dir)],
-            cwd=output_dir,
-            capture_output=True,
-            text=True,
-        )
+        thread_id = config.get("configurable", {}).get("thread_id")
+        with scheduler.acquire("compile", thread_id), LATEX_COMPILE_DURATION.time(), span("latex.compile", file=tex_filename):
+            # Killed right away if the chat turn is cancelled.
+            result = run_subprocess(["tectonic", tex_filename, "--outdir", str(output_dir)], cwd=output_dir)
 
         if result.returncode != 0:
             raise RuntimeError(f"LaTeX compilation failed: {result.stderr}")
@@ -145,7 +152,9 @@ def render_latex_pdf(latex_content: str = None) -> str:
             raise FileNotFoundError(f"PDF file was not generated. Expected: {final_pdf}")
 
         download_url = f"http://localhost:8000/papers/download/{pdf_filename}"
-        return f"## ✅ PDF Successfully Generated!\n\n**📄 Filename:** `{pdf_filename}`\n\n**🎉 Your professional research paper is ready!**\n\nThe PDF has been compiled successfully with:\n• All formatting properly rendered\n• Mathematical equations displayed correctly\n• Tables and figures included\n• References properly formatted\n\n**📥 [Click here to download your PDF]({download_url})**\n\n*Note: The download will start automatically when you click the link.*"
+        return f"## ✅ PDF Successfully Generated!\n\n**📄 Filename:** `{pdf_filename}`\n\n**🎉 Your professional research paper is ready!**\n\nThe PDF has been compiled successfully with:\n• All formatting properly rendered\n• Mathematical equations displayed correctly\n• Tables and figures included\n• References properly formatted\n\n**📥 [Click here to download your PDF]({download_url})**\n\n*Note: The download will start automatically when you click the link.*", PdfDocumentArtifact(filename=pdf_filename, download_url=download_url).model_dump()
 
+    except (CapacityExceeded, RunCancelled):
+        raise
     except Exception as e:
         raise Exception(f"Error rendering LaTeX: {str(e)}")
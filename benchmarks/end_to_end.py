@@ -0,0 +1,157 @@
+"""End-to-end benchmark of the chat path with the offline scripted model.
+
+Drives complete INITIAL_PROMPT sessions (greeting, subject, subtopic search,
+paper analysis, topic selection, paper writing and, when tectonic is
+installed, PDF rendering) through ChatInteractor -> graph -> ToolNode with
+MODEL_PROVIDER=scripted. arXiv results and PDF text come from in-process
+fixtures, so nothing touches the network. Each turn is split into model time,
+tool time and the remaining graph/API overhead using its request trace.
+
+``--fast-latency`` turns on tiered model routing (``MODEL_ROUTING=tiered``) with
+a fast-tier scripted model of that latency, and reports the calls, latency and
+tokens of each tier.
+
+Usage:
+    python -m benchmarks.end_to_end --sessions 20 --concurrency 4 --latency 0.05
+    python -m benchmarks.end_to_end --latency 0.4 --fast-latency 0.1
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["MODEL_PROVIDER"] = "scripted"
+os.environ.setdefault("PDF_PREFETCH_BUDGET", "0")
+
+import backend.tools.arxiv as arxiv_tool
+import backend.tools.read as read_tool
+from backend.agents import graph as graph_module
+from backend.agents.routing import MODEL_TIER_CALLS, MODEL_TIER_DURATION, MODEL_TIER_ESCALATIONS, MODEL_TIER_TOKENS
+from backend.interactors.chat import ChatInteractor
+from backend.monitoring.tracing import trace_store
+from backend.schemas.chat import ChatMessage
+
+STEPS = [
+    ("greeting", "hello"),
+    ("subject", "make paper on Mathematics"),
+    ("search", "interested in Graph Theory"),
+    ("analysis", "I am interested in paper 2"),
+    ("topics", "choose best topics for me"),
+    ("write", "Yes, write the paper"),
+    ("pdf", "Yes, generate PDF"),
+]
+
+FIXTURE_ENTRIES = [
+    {
+        "title": f"Fixture Paper {i} on Spectral Graph Theory",
+        "summary": "We study spectral properties of sparse graphs and their applications. " * 8,
+        "authors": ["A. Author", "B. Author", "C. Author", "D. Author"],
+        "pdf": f"http://arxiv.org/pdf/2401.0000{i}v1",
+    }
+    for i in range(1, 6)
+]
+FIXTURE_TEXT = ("Introduction. Spectral graph theory relates eigenvalues of graph matrices to structure. " * 200).strip()
+
+
+def use_fixtures() -> None:
+    arxiv_tool.search_arxiv_papers = lambda topic, max_results=5: {"entries": [dict(entry) for entry in FIXTURE_ENTRIES]}
+    read_tool.fetch_pdf_text = lambda url, should_continue=None: FIXTURE_TEXT
+
+
+def span_totals(span: dict, totals: dict) -> None:
+    if span["name"] == "llm":
+        totals["model"] += span["duration_ms"] or 0.0
+    elif span["name"].startswith("tool:"):
+        totals["tool"] += span["duration_ms"] or 0.0
+    for child in span["children"]:
+        span_totals(child, totals)
+
+
+def run_session(session: int, steps) -> list:
+    interactor = ChatInteractor()
+    thread_id = f"e2e-{session}"
+    results = []
+    for name, text in steps:
+        started = time.perf_counter()
+        response = interactor.process_chat(ChatMessage(message=text, thread_id=thread_id))
+        elapsed = (time.perf_counter() - started) * 1000
+
+        totals = {"model": 0.0, "tool": 0.0}
+        trace = trace_store.get(response.request_id)
+        if trace is not None:
+            span_totals(trace.to_dict()["root"], totals)
+        results.append((name, elapsed, totals["model"], totals["tool"], response.response))
+    return results
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(q * len(ordered))) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="complete sessions to run (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions running at once (default: 4)")
+    parser.add_argument("--latency", type=float, default=0.05, help="scripted model latency in seconds (default: 0.05)")
+    parser.add_argument("--fast-latency", type=float, help="route control steps to a fast-tier scripted model with this latency")
+    args = parser.parse_args()
+
+    graph_module.scripted_latency = args.latency
+    if args.fast_latency is not None:
+        graph_module.model_routing = "tiered"
+        graph_module.scripted_fast_latency = args.fast_latency
+    use_fixtures()
+    steps = STEPS if shutil.which("tectonic") else STEPS[:-1]
+
+    workdir = tempfile.mkdtemp(prefix="e2e-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # papers are written to ./output
+    try:
+        run_session(-1, steps)  # warm up graph construction and lazy imports
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            sessions = list(pool.map(lambda session: run_session(session, steps), range(args.sessions)))
+        wall = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    by_step = defaultdict(list)
+    for results in sessions:
+        for name, elapsed, model, tool, _ in results:
+            by_step[name].append((elapsed, model, tool))
+
+    print(f"{'step':>9} {'p50 ms':>9} {'p95 ms':>9} {'model ms':>9} {'tools ms':>9} {'overhead ms':>12}")
+    for name, _ in steps:
+        rows = by_step[name]
+        elapsed = [row[0] for row in rows]
+        model = statistics.mean(row[1] for row in rows)
+        tool = statistics.mean(row[2] for row in rows)
+        overhead = statistics.mean(row[0] - row[1] - row[2] for row in rows)
+        print(f"{name:>9} {statistics.median(elapsed):>9.1f} {percentile(elapsed, 0.95):>9.1f} {model:>9.1f} {tool:>9.1f} {overhead:>12.1f}")
+
+    turns = args.sessions * len(steps)
+    print(f"\n{args.sessions} sessions x {len(steps)} turns in {wall:.2f}s ({turns / wall:.1f} turns/s, concurrency {args.concurrency})")
+    if len(steps) < len(STEPS):
+        print("tectonic not installed; the PDF step was skipped")
+    if args.fast_latency is not None:
+        # Counters include the warm-up session.
+        print(f"\n{'tier':>9} {'calls':>7} {'mean ms':>9} {'prompt tok':>11} {'output tok':>11}")
+        for tier in ("fast", "large"):
+            calls = MODEL_TIER_CALLS.value(tier=tier)
+            mean = MODEL_TIER_DURATION.sum(tier=tier) / calls * 1000 if calls else 0.0
+            print(
+                f"{tier:>9} {calls:>7.0f} {mean:>9.1f} {MODEL_TIER_TOKENS.value(tier=tier, kind='prompt'):>11.0f} "
+                f"{MODEL_TIER_TOKENS.value(tier=tier, kind='completion'):>11.0f}"
+            )
+        escalations = sum(MODEL_TIER_ESCALATIONS.value(reason=reason) for reason in ("truncated", "generation_tool_call"))
+        print(f"escalations from fast to large: {escalations:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Local stand-ins for the arXiv API, arXiv's PDF host and a misbehaving chat model.
+
+``FakeUpstream`` serves, on one local port:
+
+- ``/api/query``: an Atom feed in the arXiv API format with deterministic
+  entries for any ``search_query``, honouring ``start`` and ``max_results``;
+- ``/pdf/<id>``: a small, valid multi-page PDF whose text PyPDF2 can extract.
+
+Point the backend at it with ``ARXIV_API_URL=http://127.0.0.1:<port>/api/query``;
+the PDF links in the feed already point back at the same server.
+
+``scripted_attempts`` builds a chat model whose successive invocations are slow,
+fail or answer as scripted, for exercising ``ModelCaller`` deadlines, hedging
+and retries.
+
+Usage:
+    python -m benchmarks.fakes --port 8100 --arxiv-latency 0.3 --pdf-latency 0.5
+"""
+import argparse
+import hashlib
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+WORDS = (
+    "graph spectral learning network quantum sparse neural optimal random algebraic model "
+    "bound inference robust adaptive scalable stochastic convex geometric dynamic structure"
+).split()
+
+
+def _words(seed: str, count: int) -> List[str]:
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    return [WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(count)]
+
+
+def build_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal PDF with one Helvetica text page per list of lines."""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for index, lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        kids.append(f"{page_id} 0 R")
+        body = ["BT", "/F1 10 Tf", "14 TL", "56 760 Td"]
+        for line in lines:
+            text = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            body.append(f"({text}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1", "replace")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii")
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("ascii")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+    xref_at = len(output)
+    size = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for object_id in range(1, size):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_at)
+    return bytes(output)
+
+
+def fixture_pages(paper_id: str, pages: int = 6) -> List[List[str]]:
+    """The text lines of each page of ``fixture_pdf(paper_id, pages)``."""
+    sections = ["Abstract", "Introduction", "Related Work", "Method", "Results", "Conclusion"]
+    content = []
+    for page in range(pages):
+        heading = sections[page % len(sections)]
+        lines = [f"{page + 1} {heading}"]
+        for line in range(45):
+            lines.append(" ".join(_words(f"{paper_id}:{page}:{line}", 14)))
+        content.append(lines)
+    return content
+
+
+@lru_cache(maxsize=256)
+def fixture_pdf(paper_id: str, pages: int = 6) -> bytes:
+    return build_pdf(fixture_pages(paper_id, pages))
+
+
+def build_atom_feed(query: str, start: int, max_results: int, pdf_base_url: str, total: int = 1000) -> str:
+    entries = []
+    for position in range(start, min(start + max_results, total)):
+        paper_id = f"2401.{hashlib.sha256(f'{query}:{position}'.encode()).hexdigest()[:5]}v1"
+        title = " ".join(word.title() for word in _words(f"title:{paper_id}", 8))
+        summary = " ".join(_words(f"summary:{paper_id}", 120))
+        authors = "".join(
+            f"<author><name>{escape(name.title())} Author</name></author>" for name in _words(f"authors:{paper_id}", 4)
+        )
+        entries.append(
+            "<entry>"
+            f"<id>http://arxiv.org/abs/{paper_id}</id>"
+            "<updated>2024-01-15T00:00:00Z</updated><published>2024-01-15T00:00:00Z</published>"
+            f"<title>{escape(title)}</title>"
+            f"<summary>  {escape(summary)}\n</summary>"
+            f"{authors}"
+            f'<link href="http://arxiv.org/abs/{paper_id}" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="{pdf_base_url}/{paper_id}" rel="related" type="application/pdf"/>'
+            '<arxiv:primary_category term="cs.DM" scheme="http://arxiv.org/schemas/atom"/>'
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<title>ArXiv Query: search_query={escape(query)}</title>"
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+        f"<opensearch:startIndex>{start}</opensearch:startIndex>"
+        f"<opensearch:itemsPerPage>{max_results}</opensearch:itemsPerPage>"
+        + "".join(entries)
+        + "</feed>"
+    )
+
+
+def scripted_attempts(*steps) -> Tuple[RunnableLambda, List[tuple]]:
+    """A model whose n-th invocation sleeps ``steps[n][0]`` seconds and then returns or raises ``steps[n][1]``.
+
+    Invocations past the last step repeat it. Also returns the list of steps
+    taken so far, one entry per invocation.
+    """
+    calls = []
+    lock = threading.Lock()
+
+    def respond(messages):
+        with lock:
+            step = steps[min(len(calls), len(steps) - 1)]
+            calls.append(step)
+        time.sleep(step[0])
+        if isinstance(step[1], Exception):
+            raise step[1]
+        return AIMessage(content=step[1])
+    return RunnableLambda(respond), calls
+
+
+class FakeUpstream:
+    """Serves the fake arXiv API and PDF host from a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, arxiv_latency: float = 0.0, pdf_latency: float = 0.0):
+        self.arxiv_latency = arxiv_latency
+        self.pdf_latency = pdf_latency
+        self.requests = {"arxiv": 0, "pdf": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def arxiv_api_url(self) -> str:
+        return f"{self.base_url}/api/query"
+
+    def start(self) -> "FakeUpstream":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeUpstream":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == "/api/query":
+                    upstream._count("arxiv")
+                    params = parse_qs(url.query)
+                    query = params.get("search_query", ["all:"])[0]
+                    start = int(params.get("start", ["0"])[0])
+                    max_results = int(params.get("max_results", ["10"])[0])
+                    time.sleep(upstream.arxiv_latency)
+                    body = build_atom_feed(query, start, max_results, f"{upstream.base_url}/pdf").encode("utf-8")
+                    self._send(body, "application/atom+xml; charset=utf-8")
+                elif url.path.startswith("/pdf/"):
+                    upstream._count("pdf")
+                    time.sleep(upstream.pdf_latency)
+                    self._send(fixture_pdf(url.path[len("/pdf/"):]), "application/pdf")
+                else:
+                    self.send_error(404)
+
+            def _send(self, body: bytes, content_type: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--arxiv-latency", type=float, default=0.0, help="seconds added to each feed response")
+    parser.add_argument("--pdf-latency", type=float, default=0.0, help="seconds added to each PDF response")
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(port=args.port, arxiv_latency=args.arxiv_latency, pdf_latency=args.pdf_latency).start()
+    print(f"ARXIV_API_URL={upstream.arxiv_api_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        upstream.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Report where import time goes when a module is loaded in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.import_profile                  # profile `import main`
+    python -m benchmarks.import_profile --module backend.agents.graph --top 30
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules that should only be imported once a chat turn actually needs them.
+LAZY_MODULES = ["langchain_google_genai", "google.genai", "PyPDF2", "langgraph", "backend.agents.graph"]
+
+
+def profile_import(module: str) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_time = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return {"module": module, "wall_time": wall_time, "entries": entries}
+
+
+def print_report(profile: dict, top: int) -> None:
+    entries = profile["entries"]
+    loaded = {entry["module"] for entry in entries}
+    total_us = sum(entry["self_us"] for entry in entries)
+
+    print(f"import {profile['module']}: {profile['wall_time'] * 1000:.0f} ms wall, "
+          f"{total_us / 1000:.0f} ms importing {len(entries)} modules")
+
+    print(f"\nTop {top} modules by cumulative import time:")
+    for entry in sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[:top]:
+        print(f"  {entry['cumulative_us'] / 1000:9.1f} ms  {entry['self_us'] / 1000:8.1f} ms self  {entry['module']}")
+
+    print("\nModules expected to load lazily:")
+    for module in LAZY_MODULES:
+        state = "LOADED at import" if module in loaded else "not loaded"
+        print(f"  {module:<28} {state}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=20, help="number of modules to list")
+    args = parser.parse_args()
+
+    print_report(profile_import(args.module), args.top)
+
+
+if __name__ == "__main__":
+    main()
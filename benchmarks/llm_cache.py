@@ -0,0 +1,84 @@
+"""Benchmark the exact-match LLM response cache against a fake chat model.
+
+Runs the same scripted conversation on several threads through the real graph,
+once without the cache and once with a fresh SQLite cache, using a fake model
+with fixed latency instead of Gemini. Checks that cached turns return the same
+answers as uncached ones and reports model calls and per-turn latency.
+
+Usage:
+    python -m benchmarks.llm_cache --threads 20 --latency 0.2
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import MemorySaver
+
+import backend.agents.graph as graph_module
+from backend.agents.prompts import INITIAL_PROMPT
+from backend.services.llm_cache import LLMCache
+
+CONVERSATION = ["hello", "make paper on graph neural networks", "list the subtopics again"]
+
+
+def fake_model(latency: float, calls: list):
+    def respond(messages):
+        calls.append(1)
+        time.sleep(latency)
+        last = messages[-1].content
+        return AIMessage(content=f"Answer to {last!r} after {len(messages)} messages")
+    return RunnableLambda(respond)
+
+
+def run_threads(threads: int, cache, latency: float) -> dict:
+    calls = []
+    graph_module._models = {"large": fake_model(latency, calls)}
+    graph_module.get_llm_cache = lambda: cache
+    graph = graph_module.build_graph(MemorySaver())
+
+    timings, answers = [], []
+    for thread in range(threads):
+        config = {"configurable": {"thread_id": f"bench-{thread}"}}
+        for turn, text in enumerate(CONVERSATION):
+            messages = [HumanMessage(content=text)]
+            if turn == 0:
+                messages.insert(0, SystemMessage(content=INITIAL_PROMPT))
+            started = time.perf_counter()
+            state = graph.invoke({"messages": messages}, config)
+            timings.append(time.perf_counter() - started)
+            answers.append(state["messages"][-1].content)
+    return {"calls": len(calls), "timings": timings, "answers": answers}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=20, help="conversations to run (default: 20)")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency in seconds (default: 0.2)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(str(Path(tmp) / "llm_responses.sqlite3"))
+        results = {
+            "uncached": run_threads(args.threads, None, args.latency),
+            "cached": run_threads(args.threads, cache, args.latency),
+        }
+        entries = len(cache)
+
+    if results["cached"]["answers"] != results["uncached"]["answers"]:
+        raise SystemExit("cached answers differ from uncached answers")
+
+    print(f"{'mode':>9} {'model calls':>12} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+    for mode, result in results.items():
+        timings = sorted(result["timings"])
+        p50 = statistics.median(timings) * 1000
+        p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+        print(f"{mode:>9} {result['calls']:>12} {p50:>9.1f} {p95:>9.1f} {sum(timings):>9.2f}")
+    print(f"\n{entries} cache entries for {args.threads} threads x {len(CONVERSATION)} turns; answers identical.")
+
+
+if __name__ == "__main__":
+    main()
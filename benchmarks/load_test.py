@@ -0,0 +1,212 @@
+"""HTTP load test for the API with local stand-ins for arXiv and its PDF host.
+
+Starts the fake arXiv API and PDF server from ``benchmarks.fakes`` and an API
+server (uvicorn, ``MODEL_PROVIDER=scripted``) pointed at them, then runs many
+simulated users concurrently. Each user walks the INITIAL_PROMPT workflow on
+its own thread_id through ``POST /chat/``, lists papers with ``GET /papers/``
+and downloads one with ``GET /papers/download/{filename}``. The report gives
+per-endpoint throughput, latency percentiles and error rates.
+
+Pass ``--base-url`` to drive an already running server instead; it then has to
+be configured (model provider, ``ARXIV_API_URL``) by whoever started it.
+
+Usage:
+    python -m benchmarks.load_test --users 50 --sessions 2 --model-latency 0.3
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from benchmarks.fakes import FakeUpstream, fixture_pdf
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+WORKFLOW = [
+    ("greeting", "hello"),
+    ("subject", "make paper on Computer Science"),
+    ("search", "interested in {topic}"),
+    ("analysis", "I am interested in paper 2"),
+    ("topics", "choose best topics for me"),
+    ("write", "Yes, write the paper"),
+]
+
+SEARCH_TOPICS = ["Machine Learning", "Computer Vision", "Cybersecurity", "Databases", "Computer Networks", "Software Engineering"]
+
+TURN_ERROR_PREFIXES = ("I encountered an error", "I'm sorry, I couldn't process")
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, elapsed: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.samples[endpoint].append(elapsed)
+            if error is not None:
+                self.errors[endpoint][error] += 1
+
+
+def timed_request(recorder: Recorder, endpoint: str, session: requests.Session, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = session.request(method, url, timeout=120, **kwargs)
+    except requests.RequestException as e:
+        recorder.record(endpoint, time.perf_counter() - started, type(e).__name__)
+        return None
+    elapsed = time.perf_counter() - started
+
+    error = None if response.ok else f"HTTP {response.status_code}"
+    if error is None and endpoint.startswith("POST /chat/"):
+        if response.json().get("response", "").startswith(TURN_ERROR_PREFIXES):
+            error = "turn_error"
+    recorder.record(endpoint, elapsed, error)
+    return response if response.ok else None
+
+
+def run_user(base_url: str, user: int, sessions: int, think_time: float, recorder: Recorder) -> None:
+    http = requests.Session()
+    for _ in range(sessions):
+        thread_id = f"load-{user}-{uuid.uuid4().hex[:8]}"
+        for step, text in WORKFLOW:
+            # Users spread over a few subtopics, so some searches share an upstream request and some don't.
+            message = text.format(topic=SEARCH_TOPICS[user % len(SEARCH_TOPICS)])
+            timed_request(
+                recorder, f"POST /chat/ [{step}]", http, "POST", f"{base_url}/chat/",
+                json={"message": message, "thread_id": thread_id, "message_id": uuid.uuid4().hex},
+            )
+            if think_time:
+                time.sleep(think_time)
+
+        listing = timed_request(recorder, "GET /papers/", http, "GET", f"{base_url}/papers/")
+        papers = listing.json().get("papers", []) if listing is not None else []
+        if papers:
+            filename = papers[user % len(papers)]["filename"]
+            timed_request(recorder, "GET /papers/download/{filename}", http, "GET", f"{base_url}/papers/download/{filename}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(workdir: Path, upstream: FakeUpstream, model_latency: float, workers: int) -> tuple:
+    # Seed a few PDFs so /papers/ and downloads have something to serve without tectonic.
+    output_dir = workdir / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(3):
+        (output_dir / f"paper_fixture_{i}.pdf").write_bytes(fixture_pdf(f"fixture-{i}"))
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        MODEL_PROVIDER="scripted",
+        SCRIPTED_MODEL_LATENCY=str(model_latency),
+        ARXIV_API_URL=upstream.arxiv_api_url,
+        # The fake host has no rate limit to honour; keep the arXiv pacing out of the measurement.
+        ARXIV_MIN_INTERVAL_SECONDS="0",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(REPO_ROOT),
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"API server exited with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/papers/", timeout=1).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("API server did not become ready within 60s")
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def report(recorder: Recorder, wall: float) -> None:
+    print(f"{'endpoint':<40} {'requests':>8} {'req/s':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    total = failed = 0
+    for endpoint in sorted(recorder.samples):
+        samples = recorder.samples[endpoint]
+        errors = sum(recorder.errors[endpoint].values())
+        total += len(samples)
+        failed += errors
+        print(
+            f"{endpoint:<40} {len(samples):>8} {len(samples) / wall:>7.1f} "
+            f"{statistics.median(samples) * 1000:>8.1f} {percentile(samples, 0.90) * 1000:>8.1f} "
+            f"{percentile(samples, 0.99) * 1000:>8.1f} {max(samples) * 1000:>8.1f} {errors / len(samples):>7.1%}"
+        )
+    print(f"\n{total} requests in {wall:.1f}s ({total / wall:.1f} req/s), error rate {failed / max(total, 1):.2%}")
+    for endpoint, kinds in sorted(recorder.errors.items()):
+        if not kinds:
+            continue
+        details = ", ".join(f"{kind} x{count}" for kind, count in sorted(kinds.items()))
+        print(f"  {endpoint}: {details}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users (default: 20)")
+    parser.add_argument("--sessions", type=int, default=1, help="complete sessions per user (default: 1)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds a user pauses between chat turns")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="scripted model latency in seconds (default: 0.3)")
+    parser.add_argument("--arxiv-latency", type=float, default=0.3, help="fake arXiv API latency in seconds (default: 0.3)")
+    parser.add_argument("--pdf-latency", type=float, default=0.5, help="fake PDF host latency in seconds (default: 0.5)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (default: 1)")
+    parser.add_argument("--base-url", help="drive this running server instead of starting one")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    upstream = process = None
+    workdir = tempfile.TemporaryDirectory(prefix="load-test-")
+    try:
+        base_url = args.base_url
+        if base_url is None:
+            upstream = FakeUpstream(arxiv_latency=args.arxiv_latency, pdf_latency=args.pdf_latency).start()
+            process, base_url = start_api(Path(workdir.name), upstream, args.model_latency, args.workers)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            futures = [pool.submit(run_user, base_url, user, args.sessions, args.think_time, recorder) for user in range(args.users)]
+            for future in futures:
+                future.result()
+        wall = time.perf_counter() - started
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if upstream is not None:
+            upstream.stop()
+        workdir.cleanup()
+
+    print(f"{args.users} users x {args.sessions} sessions against {base_url}\n")
+    report(recorder, wall)
+    if upstream is not None:
+        print(f"\nUpstream requests: arXiv {upstream.requests['arxiv']}, PDF {upstream.requests['pdf']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Micro-benchmarks for the tools' pure-Python hot paths, with regression checks.
+
+Cases run over a deterministic fixture corpus built in memory:
+
+- ``arxiv.parse_xml``: ``parse_arxiv_xml`` on a 500-entry Atom feed
+- ``arxiv.format_results``: ``format_search_results`` (the arxiv_search output) for 50 entries
+- ``latex.validate``: ``validate_and_fix_latex`` on a ~10x generated paper
+- ``paper.build``: the ``generate_detailed_*`` builders plus ``create_professional_paper``
+- ``pdf.extract``: ``extract_pdf_text`` (the selected backend, as used by read_pdf) on three 20-page PDFs
+- ``pdf.passages``: building the BM25 passage index of a 20-page paper and ranking one question
+- ``pdf.extract.corpus``: the same over every PDF in ``--pdf-dir``, when given
+
+Each case is timed in several repeats of an auto-calibrated loop and the best
+per-call time is compared with the stored baseline. A case over the threshold
+is measured once more, and the command exits with status 1 when it is still
+slower than its baseline by more than the threshold.
+Baselines depend on the machine: record one with ``--save-baseline`` on the box
+that runs the comparison.
+
+Usage:
+    python -m benchmarks.micro                   # compare with benchmarks/baseline.json
+    python -m benchmarks.micro --save-baseline   # record a new baseline
+    python -m benchmarks.micro --threshold 0.1 --only arxiv
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fakes import build_atom_feed, fixture_pdf
+from backend.services.passages import PassageIndex
+from backend.services.pdf_text import extract_pdf_text
+from backend.tools.arxiv import format_search_results, parse_arxiv_xml
+from backend.tools.comprehensive_paper import (
+    create_professional_paper,
+    generate_detailed_abstract,
+    generate_detailed_conclusion,
+    generate_detailed_discussion,
+    generate_detailed_introduction,
+    generate_detailed_methodology,
+    generate_detailed_results,
+    generate_keywords,
+    generate_literature_review,
+)
+from backend.tools.write import validate_and_fix_latex
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+TITLE = "Spectral Methods for Sparse Graph Learning"
+AREA = "Graph Theory"
+FINDINGS = "Scalable spectral clustering, bounds on mixing time & robust sparsification"
+METHODOLOGY = "Analytical modelling of random graphs backed by experiments on public benchmarks"
+RELATED = "Prior work studies spectral partitioning, expander graphs and sparsifiers. " * 10
+
+
+def build_paper() -> str:
+    return create_professional_paper(
+        title=TITLE,
+        abstract=generate_detailed_abstract(TITLE, AREA, FINDINGS),
+        keywords=generate_keywords(AREA, FINDINGS),
+        introduction=generate_detailed_introduction(AREA, FINDINGS),
+        literature_review=generate_literature_review(AREA, RELATED),
+        methodology=generate_detailed_methodology(METHODOLOGY, AREA),
+        results=generate_detailed_results(FINDINGS, AREA),
+        discussion=generate_detailed_discussion(FINDINGS, AREA),
+        conclusion=generate_detailed_conclusion(FINDINGS, AREA),
+    )
+
+
+def big_latex_document(copies: int = 10) -> str:
+    paper = build_paper()
+    head, body = paper.split(r"\begin{document}", 1)
+    body, _ = body.rsplit(r"\end{document}", 1)
+    return head + r"\begin{document}" + body * copies + r"\end{document}"
+
+
+def build_cases(pdf_dir: Optional[Path]) -> Dict[str, Callable[[], object]]:
+    feed = build_atom_feed("all:graph+theory", 0, 500, "http://127.0.0.1/pdf")
+    entries = parse_arxiv_xml(build_atom_feed("all:graph+theory", 0, 50, "http://127.0.0.1/pdf"))["entries"]
+    latex = big_latex_document()
+    pdfs = [fixture_pdf(f"micro-{i}", pages=20) for i in range(3)]
+    paper_text = extract_pdf_text(pdfs[0])
+
+    cases = {
+        "arxiv.parse_xml": lambda: parse_arxiv_xml(feed),
+        "arxiv.format_results": lambda: format_search_results("graph theory", entries),
+        "latex.validate": lambda: validate_and_fix_latex(latex),
+        "paper.build": build_paper,
+        "pdf.extract": lambda: [extract_pdf_text(data) for data in pdfs],
+        "pdf.passages": lambda: PassageIndex(paper_text).search("spectral bounds for sparse graph learning"),
+    }
+    if pdf_dir is not None:
+        corpus = [path.read_bytes() for path in sorted(pdf_dir.glob("*.pdf"))]
+        if not corpus:
+            raise SystemExit(f"No PDFs found in {pdf_dir}")
+        cases["pdf.extract.corpus"] = lambda: [extract_pdf_text(data) for data in corpus]
+    return cases
+
+
+def measure(fn: Callable[[], object], repeats: int, min_time: float) -> List[float]:
+    """Per-call seconds for each repeat, looping enough calls to fill ``min_time``.
+
+    The calibration loop doubles as warm-up and is not counted. The garbage
+    collector is paused while timing, as timeit does.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _timed_repeats(fn, repeats, min_time)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _timed_repeats(fn: Callable[[], object], repeats: int, min_time: float) -> List[float]:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return timings
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine()}
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing, as a fraction (default: 0.25)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed repeats per case (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds each repeat should last (default: 0.2)")
+    parser.add_argument("--only", help="run only cases whose name contains this string")
+    parser.add_argument("--pdf-dir", type=Path, help="directory of real-world PDFs for the pdf.extract.corpus case")
+    args = parser.parse_args()
+
+    cases = build_cases(args.pdf_dir)
+    if args.only:
+        cases = {name: fn for name, fn in cases.items() if args.only in name}
+
+    results = {}
+    for name, fn in cases.items():
+        timings = measure(fn, args.repeats, args.min_time)
+        results[name] = {"seconds": min(timings), "median_seconds": statistics.median(timings)}
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline) or {"results": {}}
+        baseline["environment"] = environment()
+        baseline["created_at"] = datetime.now().isoformat(timespec="seconds")
+        baseline["results"].update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        for name, result in results.items():
+            print(f"{name:<24} {format_seconds(result['seconds']):>12}")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        raise SystemExit(f"No baseline at {args.baseline}; record one with --save-baseline")
+    if baseline.get("environment") != environment():
+        print(f"warning: baseline was recorded on {baseline.get('environment')}, this is {environment()}\n")
+
+    regressions = []
+    print(f"{'case':<24} {'baseline':>12} {'current':>12} {'change':>8}  status")
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<24} {'-':>12} {format_seconds(result['seconds']):>12} {'':>8}  new")
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        if ratio > 1 + args.threshold:
+            # Re-measure once before failing so a burst of machine noise doesn't read as a regression.
+            result["seconds"] = min(result["seconds"], min(measure(cases[name], args.repeats, args.min_time)))
+            ratio = result["seconds"] / reference["seconds"]
+        if ratio > 1 + args.threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - args.threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        print(f"{name:<24} {format_seconds(reference['seconds']):>12} {format_seconds(result['seconds']):>12} {ratio - 1:>+8.1%}  {status}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo case regressed by more than {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
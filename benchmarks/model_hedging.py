@@ -0,0 +1,117 @@
+"""Tail latency of model calls with and without hedged requests, using a fake model.
+
+Sends the same number of calls through ``ModelCaller`` once without hedging and
+once per ``--percentiles`` value, against a local fake model whose latency is
+drawn from a seeded distribution:
+
+- ``scripted``: the ScriptedChatModel itself, ``--latency`` plus uniform ``--jitter``;
+- ``bimodal``: ``--latency``, except a ``--slow-fraction`` of calls take ``--slow-latency``;
+- ``lognormal``: median ``--latency`` with shape ``--sigma``.
+
+The unhedged run doubles as warm-up: its attempt latencies seed the hedging
+window of the hedged runs. The report gives per-call latency percentiles and
+attempts per call, i.e. the extra upstream load hedging costs.
+
+Usage:
+    python -m benchmarks.model_hedging --calls 400 --distribution bimodal
+    python -m benchmarks.model_hedging --distribution scripted --latency 0.1 --jitter 0.4
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from backend.agents.scripted_model import ScriptedChatModel
+from backend.services.model_calls import MODEL_CALL_ATTEMPTS, ModelCaller
+
+MESSAGES = [HumanMessage(content="hello")]
+
+
+def latency_sampler(args) -> Callable[[], float]:
+    rng = random.Random(args.seed)
+    lock = threading.Lock()
+
+    def sample() -> float:
+        with lock:
+            if args.distribution == "bimodal":
+                return args.slow_latency if rng.random() < args.slow_fraction else args.latency
+            return rng.lognormvariate(0, args.sigma) * args.latency
+    return sample
+
+
+def fake_model(args):
+    if args.distribution == "scripted":
+        return ScriptedChatModel(latency=args.latency, jitter=args.jitter, seed=args.seed)
+    sample = latency_sampler(args)
+
+    def respond(messages):
+        time.sleep(sample())
+        return AIMessage(content="ok")
+    return RunnableLambda(respond)
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def run_calls(caller: ModelCaller, model, calls: int, concurrency: int) -> dict:
+    attempts_before = sum(MODEL_CALL_ATTEMPTS.value(kind=kind) for kind in ("first", "hedge", "retry"))
+
+    def one_call(_) -> float:
+        started = time.perf_counter()
+        caller.invoke(model, MESSAGES)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = list(pool.map(one_call, range(calls)))
+    attempts = sum(MODEL_CALL_ATTEMPTS.value(kind=kind) for kind in ("first", "hedge", "retry")) - attempts_before
+    return {"timings": timings, "attempts": attempts}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400, help="model calls per configuration (default: 400)")
+    parser.add_argument("--concurrency", type=int, default=16, help="calls in flight at once (default: 16)")
+    parser.add_argument("--distribution", choices=("scripted", "bimodal", "lognormal"), default="bimodal")
+    parser.add_argument("--latency", type=float, default=0.05, help="base or median latency in seconds (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="scripted: uniform jitter in seconds (default: 0.2)")
+    parser.add_argument("--slow-fraction", type=float, default=0.05, help="bimodal: share of slow calls (default: 0.05)")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="bimodal: latency of a slow call (default: 1.0)")
+    parser.add_argument("--sigma", type=float, default=0.8, help="lognormal: shape parameter (default: 0.8)")
+    parser.add_argument("--percentiles", type=float, nargs="+", default=[0.9, 0.95], help="hedging thresholds to compare (default: 0.9 0.95)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = fake_model(args)
+    baseline = ModelCaller(timeout=0, budget=0, max_retries=0)
+    configurations = [("no hedging", baseline)]
+    for q in args.percentiles:
+        configurations.append((
+            f"hedge at p{q * 100:g}",
+            ModelCaller(timeout=0, budget=0, max_retries=0, hedge_percentile=q, hedge_min_samples=1, workers=2 * args.concurrency, max_in_flight=2 * args.concurrency),
+        ))
+
+    print(f"{args.calls} calls, concurrency {args.concurrency}, {args.distribution} latency\n")
+    print(f"{'configuration':<16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'mean ms':>8} {'attempts/call':>14}")
+    for name, caller in configurations:
+        if caller is not baseline:
+            for seconds in baseline.latency_window("default").samples():
+                caller.latency_window("default").add(seconds)
+        result = run_calls(caller, model, args.calls, args.concurrency)
+        timings = result["timings"]
+        print(
+            f"{name:<16} {statistics.median(timings) * 1000:>8.1f} {percentile(timings, 0.95) * 1000:>8.1f} "
+            f"{percentile(timings, 0.99) * 1000:>8.1f} {max(timings) * 1000:>8.1f} "
+            f"{statistics.mean(timings) * 1000:>8.1f} {result['attempts'] / args.calls:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
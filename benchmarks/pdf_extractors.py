@@ -0,0 +1,136 @@
+"""Compare the installed PDF text-extraction backends and pick the best one.
+
+Every backend available in ``backend.services.pdf_extractors`` (PyPDF2 always;
+pypdfium2 and pdfminer.six when installed) extracts the same corpus:
+
+- fixture PDFs from ``benchmarks.fakes``, whose exact text is known, so quality
+  is the share of the expected words the backend recovered (recall);
+- with ``--pdf-dir``, real-world PDFs, where quality is the word overlap with
+  the other backends' output (agreement), since there is no ground truth.
+
+Throughput is pages and characters per second over the whole corpus. With
+``--save`` the ranking (fastest backend whose quality is within
+``--min-quality`` of the best) is written to ``PDF_EXTRACTOR_RESULTS``, which
+``PDF_EXTRACTOR=auto`` reads at startup.
+
+Usage:
+    python -m benchmarks.pdf_extractors
+    python -m benchmarks.pdf_extractors --pdf-dir ~/papers --save
+"""
+import argparse
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.fakes import fixture_pages, fixture_pdf
+from backend.services.pdf_extractors import EXTRACTORS, PDF_EXTRACTOR_RESULTS, available_extractors
+
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+
+def words(text: str) -> Counter:
+    return Counter(word.lower() for word in _WORD.findall(text))
+
+
+def overlap(found: Counter, expected: Counter) -> float:
+    """Share of ``expected`` word occurrences that also occur in ``found``."""
+    total = sum(expected.values())
+    return sum((found & expected).values()) / total if total else 1.0
+
+
+def page_count(data: bytes) -> int:
+    return max(1, len(re.findall(rb"/Type\s*/Page[^s]", data)))
+
+
+def run_backend(name: str, corpus: List[bytes], repeats: int) -> dict:
+    extractor = EXTRACTORS[name]
+    texts: List[Optional[str]] = []
+    failures = 0
+    for data in corpus:
+        try:
+            texts.append(extractor.extract(data))
+        except Exception:
+            texts.append(None)
+            failures += 1
+
+    best = float("inf")
+    readable = [data for data, text in zip(corpus, texts) if text is not None]
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for data in readable:
+            extractor.extract(data)
+        best = min(best, time.perf_counter() - started)
+
+    pages = sum(page_count(data) for data in readable)
+    characters = sum(len(text) for text in texts if text is not None)
+    return {
+        "texts": texts,
+        "seconds": best,
+        "pages_per_second": pages / best if best else 0.0,
+        "chars_per_second": characters / best if best else 0.0,
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", type=Path, help="directory of real-world PDFs to add to the corpus")
+    parser.add_argument("--fixtures", type=int, default=5, help="fixture PDFs of 20 pages in the corpus (default: 5)")
+    parser.add_argument("--repeats", type=int, default=3, help="timed passes over the corpus per backend (default: 3)")
+    parser.add_argument("--min-quality", type=float, default=0.02, help="how far below the best quality a backend may score and still win on speed (default: 0.02)")
+    parser.add_argument("--save", action="store_true", help=f"store the ranking for PDF_EXTRACTOR=auto (in {PDF_EXTRACTOR_RESULTS})")
+    args = parser.parse_args()
+
+    fixture_ids = [f"extractor-{i}" for i in range(args.fixtures)]
+    fixtures = [fixture_pdf(paper_id, pages=20) for paper_id in fixture_ids]
+    expected = [words("\n".join(line for page in fixture_pages(paper_id, 20) for line in page)) for paper_id in fixture_ids]
+    real = [path.read_bytes() for path in sorted(args.pdf_dir.glob("*.pdf"))] if args.pdf_dir else []
+    if args.pdf_dir and not real:
+        raise SystemExit(f"No PDFs found in {args.pdf_dir}")
+
+    backends = available_extractors()
+    print(f"Backends installed: {', '.join(backends)}; corpus: {len(fixtures)} fixture PDFs, {len(real)} real PDFs\n")
+    results: Dict[str, dict] = {name: run_backend(name, fixtures + real, args.repeats) for name in backends}
+
+    for name, result in results.items():
+        fixture_texts = result["texts"][:len(fixtures)]
+        result["recall"] = sum(overlap(words(text or ""), want) for text, want in zip(fixture_texts, expected)) / max(len(fixtures), 1)
+        agreement = []
+        for position in range(len(fixtures), len(fixtures) + len(real)):
+            text = result["texts"][position]
+            others = [other["texts"][position] for other_name, other in results.items() if other_name != name and other["texts"][position]]
+            if text is not None and others:
+                agreement.append(sum(overlap(words(text), words(other)) for other in others) / len(others))
+        result["agreement"] = sum(agreement) / len(agreement) if agreement else None
+        # Fixture recall where there's nothing else to go on; otherwise the mean of both.
+        result["quality"] = result["recall"] if result["agreement"] is None else (result["recall"] + result["agreement"]) / 2
+
+    best_quality = max(result["quality"] for result in results.values())
+    eligible = [name for name in results if results[name]["quality"] >= best_quality - args.min_quality and not results[name]["failures"]]
+    ranking = sorted(eligible, key=lambda name: results[name]["seconds"]) + sorted(
+        (name for name in results if name not in eligible), key=lambda name: -results[name]["quality"]
+    )
+
+    print(f"{'backend':<10} {'seconds':>8} {'pages/s':>9} {'chars/s':>11} {'recall':>7} {'agree':>7} {'failed':>6}")
+    for name in ranking:
+        result = results[name]
+        agreement = "-" if result["agreement"] is None else f"{result['agreement']:.1%}"
+        print(
+            f"{name:<10} {result['seconds']:>8.3f} {result['pages_per_second']:>9.1f} {result['chars_per_second']:>11.0f} "
+            f"{result['recall']:>7.1%} {agreement:>7} {result['failures']:>6}"
+        )
+    print(f"\nBest backend: {ranking[0]}")
+
+    if args.save:
+        path = Path(PDF_EXTRACTOR_RESULTS)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        summary = {name: {k: v for k, v in result.items() if k != "texts"} for name, result in results.items()}
+        path.write_text(json.dumps({"ranking": ranking, "results": summary}, indent=2) + "\n", encoding="utf-8")
+        print(f"Ranking written to {path}; PDF_EXTRACTOR=auto will use {ranking[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Replay recorded chat sessions offline and compare runs.
+
+Sessions recorded with ``SESSION_RECORD_DIR`` (one JSON-lines file per thread)
+are played back through ``build_graph`` with the chat model and every tool
+replaced by stubs that return the recorded responses in order, so no model API
+or network is needed. Recorded model errors are raised again with their type,
+so the ones that were retried live are retried on replay too; a session that
+fails is reported and the others still run. Every turn of the current code is measured:
+
+- latency: wall time of the turn (graph, checkpointing and tool-node overhead;
+  add ``--simulate-latency`` to also sleep the recorded model and tool times);
+- prompt tokens: estimated from the messages the current code sends the model;
+- recorded tokens: token usage reported by the model when the session was recorded;
+- memory: serialized checkpoint size of the thread and, with ``--memory``, the
+  tracemalloc peak of the turn.
+
+Usage:
+    python -m benchmarks.replay recordings/ --output after.json
+    python -m benchmarks.replay recordings/ --output after.json --compare before.json
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.agents.graph import build_graph, tools
+from backend.agents.prompts import INITIAL_PROMPT
+from backend.monitoring.memory import checkpoint_sizes
+from backend.services.model_calls import ERROR_CLASSES, model_caller
+from backend.services.scheduler import CapacityExceeded
+
+# Exception types to re-raise recorded errors as, so classify_error makes the same retry decision as when recording.
+ERROR_CLASS_TYPES = {name: error_type for error_type, name in reversed(ERROR_CLASSES)}
+ERROR_TYPES_BY_NAME = {error_type.__name__: error_type for error_type, _ in ERROR_CLASSES}
+
+
+class ReplayDiverged(Exception):
+    pass
+
+
+def recorded_error(record: dict) -> Exception:
+    """The recorded error as the same exception type, or one of its ``error_class`` for types ERROR_CLASSES doesn't list."""
+    name, _, message = record["error"].partition(": ")
+    error_type = ERROR_TYPES_BY_NAME.get(name) or ERROR_CLASS_TYPES.get(record.get("error_class"), RuntimeError)
+    return error_type(message)
+
+
+class RecordedCalls:
+    """Recorded model responses and per-tool outputs of one session, consumed in order."""
+
+    def __init__(self, records: List[dict], simulate_latency: bool):
+        self.simulate_latency = simulate_latency
+        # Escalated fast-tier answers never reached the conversation; replay runs every step on one model.
+        discarded = {r["run_id"] for r in records if r["type"] == "model_discarded"}
+        self.model: Deque[dict] = deque(r for r in records if r["type"] == "model" and r.get("run_id") not in discarded)
+        self.tools: Dict[str, Deque[dict]] = defaultdict(deque)
+        for record in records:
+            if record["type"] == "tool":
+                self.tools[record["name"]].append(record)
+        self.prompt_tokens = 0
+
+    def wait(self, record: dict) -> None:
+        if self.simulate_latency:
+            time.sleep(record.get("duration_ms", 0) / 1000)
+
+
+class ReplayChatModel(BaseChatModel):
+    calls: RecordedCalls
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls.prompt_tokens += sum(len(str(message.content)) for message in messages) // 4
+        if not self.calls.model:
+            raise ReplayDiverged("the graph asked the model for more responses than were recorded")
+        record = self.calls.model.popleft()
+        self.calls.wait(record)
+        if "error" in record:
+            raise recorded_error(record)
+        return ChatResult(generations=[ChatGeneration(message=messages_from_dict([record["response"]])[0])])
+
+
+def replay_tools(calls: RecordedCalls) -> List[StructuredTool]:
+    def stub(name: str):
+        def run(**kwargs):
+            if not calls.tools[name]:
+                raise ReplayDiverged(f"the graph called {name} more often than recorded")
+            record = calls.tools[name].popleft()
+            calls.wait(record)
+            error = record.get("error")
+            if error:
+                if error.startswith("CapacityExceeded"):
+                    raise CapacityExceeded("replay", 1)
+                raise RuntimeError(error)
+            return record.get("content", ""), record.get("artifact")
+        return run
+
+    return [
+        StructuredTool.from_function(
+            func=stub(t.name), name=t.name, description=t.description,
+            args_schema=t.tool_call_schema, response_format="content_and_artifact",
+        )
+        for t in tools
+    ]
+
+
+def load_sessions(paths: List[Path]) -> Dict[str, List[dict]]:
+    files = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.jsonl")) if path.is_dir() else [path])
+    sessions = {}
+    for file in files:
+        with file.open(encoding="utf-8") as f:
+            sessions[file.stem] = [json.loads(line) for line in f if line.strip()]
+    return sessions
+
+
+def replay_session(name: str, records: List[dict], simulate_latency: bool, track_memory: bool) -> List[dict]:
+    calls = RecordedCalls(records, simulate_latency)
+    checkpointer = MemorySaver()
+    graph = build_graph(checkpointer, model=ReplayChatModel(calls=calls), graph_tools=replay_tools(calls))
+    config = {"configurable": {"thread_id": name}}
+
+    recorded_usage = defaultdict(int)
+    for record in records:
+        if record["type"] != "model" or "response" not in record:
+            continue
+        usage = record["response"]["data"].get("usage_metadata") or {}
+        recorded_usage[record["request_id"]] += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+    turns = []
+    for index, record in enumerate(r for r in records if r["type"] == "turn"):
+        text = record["message"]["message"]
+        messages = [HumanMessage(content=text)]
+        if index == 0:
+            messages.insert(0, SystemMessage(content=INITIAL_PROMPT))
+
+        calls.prompt_tokens = 0
+        if track_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        graph.invoke({"messages": messages}, config)
+        latency_ms = (time.perf_counter() - started) * 1000
+        peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+
+        turns.append({
+            "session": name,
+            "turn": index,
+            "message": text[:80],
+            "latency_ms": round(latency_ms, 3),
+            "recorded_latency_ms": next(
+                (r["duration_ms"] for r in records if r["type"] == "turn_end" and r["request_id"] == record["request_id"]), None
+            ),
+            "prompt_tokens": calls.prompt_tokens,
+            "recorded_tokens": recorded_usage[record["request_id"]],
+            "checkpoint_bytes": checkpoint_sizes(checkpointer).get(name, {}).get("bytes", 0),
+            "peak_bytes": peak,
+        })
+    return turns
+
+
+def summarize(turns: List[dict]) -> dict:
+    latencies = sorted(turn["latency_ms"] for turn in turns)
+    peaks = [turn["peak_bytes"] for turn in turns if turn["peak_bytes"] is not None]
+    return {
+        "turns": len(turns),
+        "latency_p50_ms": statistics.median(latencies),
+        "latency_p95_ms": latencies[max(0, int(round(0.95 * len(latencies))) - 1)],
+        "prompt_tokens": sum(turn["prompt_tokens"] for turn in turns),
+        "recorded_tokens": sum(turn["recorded_tokens"] for turn in turns),
+        "checkpoint_bytes": sum(
+            max(turn["checkpoint_bytes"] for turn in turns if turn["session"] == session)
+            for session in {turn["session"] for turn in turns}
+        ),
+        "peak_bytes": max(peaks) if peaks else None,
+    }
+
+
+def print_comparison(current: dict, previous: dict) -> None:
+    before, after = previous["summary"], current["summary"]
+    print(f"\n{'metric':<18} {'before':>14} {'after':>14} {'change':>9}")
+    for key in ("latency_p50_ms", "latency_p95_ms", "prompt_tokens", "checkpoint_bytes", "peak_bytes"):
+        if before.get(key) is None or after.get(key) is None:
+            continue
+        change = (after[key] - before[key]) / before[key] if before[key] else 0.0
+        print(f"{key:<18} {before[key]:>14.1f} {after[key]:>14.1f} {change:>+9.1%}")
+
+    previous_turns = {(turn["session"], turn["turn"]): turn for turn in previous["turns"]}
+    slower = []
+    for turn in current["turns"]:
+        old = previous_turns.get((turn["session"], turn["turn"]))
+        if old is not None and old["latency_ms"]:
+            slower.append((turn["latency_ms"] / old["latency_ms"], turn, old))
+    slower.sort(key=lambda item: item[0], reverse=True)
+    if slower:
+        print("\nSlowest turns relative to the previous run:")
+        for ratio, turn, old in slower[:5]:
+            print(f"  {turn['session']} #{turn['turn']} {turn['message']!r}: {old['latency_ms']:.1f} -> {turn['latency_ms']:.1f} ms ({ratio:.2f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+", type=Path, help="recording files or directories of them")
+    parser.add_argument("--output", type=Path, help="write per-turn results and the summary as JSON")
+    parser.add_argument("--compare", type=Path, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--simulate-latency", action="store_true", help="sleep the recorded model and tool durations")
+    parser.add_argument("--memory", action="store_true", help="track the tracemalloc peak of every turn (slower)")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.recordings)
+    if not sessions:
+        raise SystemExit("No recordings found")
+
+    if args.memory:
+        tracemalloc.start()
+    if not args.simulate_latency:
+        # Recorded errors are retried as they were live; only wait out the backoff when simulating latency.
+        model_caller.backoff = 0
+    turns, diverged, failed = [], [], []
+    for name, records in sessions.items():
+        try:
+            turns.extend(replay_session(name, records, args.simulate_latency, args.memory))
+        except ReplayDiverged as e:
+            diverged.append((name, str(e)))
+        except Exception as e:
+            failed.append((name, f"{type(e).__name__}: {e}"))
+
+    for name, reason in failed:
+        print(f"failed: {name}: {reason}")
+    if not turns:
+        raise SystemExit("Every session diverged from its recording or failed")
+    results = {"summary": summarize(turns), "turns": turns}
+    summary = results["summary"]
+    print(f"Replayed {len(sessions) - len(diverged) - len(failed)} sessions, {summary['turns']} turns")
+    print(f"latency p50 {summary['latency_p50_ms']:.1f} ms, p95 {summary['latency_p95_ms']:.1f} ms")
+    print(f"prompt tokens (estimated) {summary['prompt_tokens']}, recorded tokens {summary['recorded_tokens']}")
+    print(f"checkpoint bytes {summary['checkpoint_bytes']}" + (f", peak traced bytes {summary['peak_bytes']}" if summary["peak_bytes"] else ""))
+    for name, reason in diverged:
+        print(f"diverged: {name}: {reason}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.compare:
+        print_comparison(results, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark chat response assembly on long threads.
+
+Replays synthetic threads of 50+ turns through two assembly strategies. For
+every turn, both are fed the stream the graph would produce for the same
+thread (its history plus the turn's steps):
+
+- legacy: ``stream_mode="values"`` chunks (the whole message list after every
+  step) scanned message by message, followed by the marker scan over everything
+  collected, as ChatInteractor did before it switched to per-step deltas;
+- delta: ``stream_mode="updates"`` chunks (only what each step added) handled
+  by ``collect_turn_messages`` / ``select_final_response``, which pick the
+  reply from tool artifacts rather than scanning for marker strings.
+
+Chunks are built before timing, so only assembly is measured, and each turn is
+checked to get the same reply from both strategies before it is timed.
+
+Usage:
+    python -m benchmarks.response_assembly --turns 60 --repeat 5
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from backend.interactors.chat import collect_turn_messages, select_final_response
+
+# The marker strings ChatInteractor used to sniff tool results with.
+TOOL_RESULT_MARKERS = [
+    "📚 Recent Papers", "## **Paper", "👥 **Authors:**", "📄 **Summary:**",
+    "Key Contributions:", "Methodology:", "Research Directions:",
+    "Selected Research Topics", "Paper Completed", "PDF Generated",
+    "✅ PDF Successfully Generated", "Research Paper Generated Successfully"
+]
+
+
+def tool_output(topic: str) -> str:
+    return f"# 📚 **Recent Papers on {topic}**\n\n" + "\n\n".join(
+        f"## **Paper {i}: A study of {topic}**\n\n👥 **Authors:** A, B, C\n\n📄 **Summary:** " + "lorem ipsum " * 25
+        for i in range(1, 6)
+    )
+
+
+def tool_artifact(topic: str) -> dict:
+    return {
+        "kind": "search_results",
+        "topic": topic,
+        "papers": [{"index": i, "title": f"A study of {topic}", "authors": ["A", "B", "C"], "summary": "lorem ipsum", "pdf": None} for i in range(1, 6)],
+    }
+
+
+def turn_steps(turn: int) -> List[tuple]:
+    """(node, message) pairs a tool-using turn appends to the thread; each turn searches its own topic."""
+    tool_call_id = f"call_{turn}"
+    topic = f"Topic {turn}"
+    return [
+        ("agent", AIMessage(content="", tool_calls=[{"name": "arxiv_search", "args": {"topic": topic}, "id": tool_call_id}])),
+        ("tools", ToolMessage(content=tool_output(topic), artifact=tool_artifact(topic), tool_call_id=tool_call_id, name="arxiv_search")),
+        ("agent", AIMessage(content="Which paper are you interested in?")),
+    ]
+
+
+def values_chunks(history: List, steps: List[tuple]) -> List[List]:
+    """What ``stream_mode="values"`` yields for the turn: the whole thread after the input and after each step."""
+    messages = list(history)
+    chunks = [list(messages)]
+    for _, message in steps:
+        messages.append(message)
+        chunks.append(list(messages))
+    return chunks
+
+
+def update_chunks(history: List, steps: List[tuple]) -> List[dict]:
+    """What ``stream_mode="updates"`` yields for the same turn: each step's new messages; the history stays in the checkpoint."""
+    return [{node: {"messages": [message]}} for node, message in steps]
+
+
+def legacy_assembly(chunks: List[List]) -> str:
+    final_response = ""
+    all_responses = []
+    for chunk in chunks:
+        for message in chunk:
+            if hasattr(message, 'content') and message.content and type(message).__name__ == 'AIMessage':
+                if not message.content.startswith('<function=') and not 'function=' in message.content:
+                    all_responses.append(message.content)
+                    final_response = message.content
+            elif type(message).__name__ == 'ToolMessage' and hasattr(message, 'content') and message.content:
+                all_responses.append(message.content)
+                final_response = message.content
+
+    if all_responses:
+        tool_result = None
+        ai_response = None
+        for response in all_responses:
+            if any(marker in response for marker in TOOL_RESULT_MARKERS):
+                tool_result = response
+            else:
+                ai_response = response
+        final_response = tool_result if tool_result else (ai_response or all_responses[-1])
+    return final_response
+
+
+def delta_assembly(updates: List[dict]) -> str:
+    turn_messages: List = []
+    for update in updates:
+        collect_turn_messages(update, turn_messages)
+    return select_final_response(turn_messages)
+
+
+def run(turns: int, repeat: int) -> None:
+    timings = {"legacy": [[] for _ in range(turns)], "delta": [[] for _ in range(turns)]}
+
+    for _ in range(repeat):
+        history = [SystemMessage(content="system prompt")]
+        for turn in range(turns):
+            history.append(HumanMessage(content=f"message {turn}"))
+            steps = turn_steps(turn)
+            variants = (
+                ("legacy", legacy_assembly, values_chunks(history, steps)),
+                ("delta", delta_assembly, update_chunks(history, steps)),
+            )
+            if legacy_assembly(variants[0][2]) != delta_assembly(variants[1][2]):
+                raise SystemExit(f"turn {turn + 1}: legacy and delta assembly picked different replies")
+            for name, assemble, chunks in variants:
+                started = time.perf_counter()
+                assemble(chunks)
+                timings[name][turn].append(time.perf_counter() - started)
+            history.extend(message for _, message in steps)
+
+    print(f"{'turn':>6} {'legacy ms':>12} {'delta ms':>12} {'speedup':>9}")
+    checkpoints = sorted({1, 10, 25, 50, turns} & set(range(1, turns + 1)))
+    for turn in checkpoints:
+        legacy = statistics.median(timings["legacy"][turn - 1]) * 1000
+        delta = statistics.median(timings["delta"][turn - 1]) * 1000
+        print(f"{turn:>6} {legacy:>12.3f} {delta:>12.3f} {legacy / delta:>8.1f}x")
+
+    legacy_total = sum(statistics.median(t) for t in timings["legacy"]) * 1000
+    delta_total = sum(statistics.median(t) for t in timings["delta"]) * 1000
+    print(f"\nWhole {turns}-turn thread: legacy {legacy_total:.1f} ms, delta {delta_total:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60, help="turns per synthetic thread (default: 60)")
+    parser.add_argument("--repeat", type=int, default=5, help="threads to replay (default: 5)")
+    args = parser.parse_args()
+    run(args.turns, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,19 +15,39 @@ if "messages" not in st.session_state:
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid.uuid4())
 
-def send_message_to_backend(message: str):
-    try:
-        response = requests.post(
-            "http://localhost:8000/chat/",
-            json={"message": message, "thread_id": st.session_state.thread_id},
-            timeout=30
-        )
+def send_message_to_backend(message: str, message_id: str, attempts: int = 3):
+    # Retries reuse message_id, so the backend attaches them to the original turn instead of running it again.
+    for _ in range(attempts):
+        try:
+            response = requests.post(
+                "http://localhost:8000/chat/",
+                json={"message": message, "thread_id": st.session_state.thread_id, "message_id": message_id},
+                timeout=30
+            )
+        except requests.exceptions.Timeout:
+            continue
+        except:
+            return "❌ Cannot connect to backend server."
+
+        st.session_state.pending_message = None
         if response.status_code == 200:
             return response.json().get("response", "No response received")
+        elif response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "a few")
+            return f"⏳ Research Genie is busy right now. Please try again in {retry_after} seconds."
         else:
             return f"Error: {response.status_code}"
+
+    # Resending the same text picks the still-running turn back up.
+    st.session_state.pending_message = {"message": message, "message_id": message_id}
+    return "⌛ Research Genie is still working on this. Send the same message again in a moment to get the result."
+
+def cancel_backend_runs(thread_id: str):
+    # Stops turns still running for a thread the user is leaving; best effort.
+    try:
+        requests.post(f"http://localhost:8000/chat/{thread_id}/cancel", timeout=5)
     except:
-        return "❌ Cannot connect to backend server."
+        pass
 
 with st.sidebar:
     st.title("🧞‍♂️ Research Genie")
@@ -76,12 +96,14 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🗑️ Clear Chat", use_container_width=True, help="Clear all conversation history"):
+            cancel_backend_runs(st.session_state.thread_id)
             st.session_state.messages = []
             st.session_state.thread_id = str(uuid.uuid4())
             st.rerun()
 
     with col2:
         if st.button("🔄 New Session", use_container_width=True, help="Start fresh conversation"):
+            cancel_backend_runs(st.session_state.thread_id)
             st.session_state.thread_id = str(uuid.uuid4())
             st.rerun()
 
@@ -209,7 +231,9 @@ if prompt := st.chat_input("Ask me anything about research..."):
     
     with st.chat_message("assistant"):
         with st.spinner("🧞‍♂️ Research Genie is thinking..."):
-            response = send_message_to_backend(prompt)
+            pending = st.session_state.get("pending_message")
+            message_id = pending["message_id"] if pending and pending["message"] == prompt else str(uuid.uuid4())
+            response = send_message_to_backend(prompt, message_id)
         st.markdown(response)
 
     st.session_state.messages.append({"role": "assistant", "content": response})
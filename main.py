@@ -1,8 +1,21 @@
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=Path(__file__).parent / ".env")
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routes.chat import router as chat_router
 from backend.routes.papers import router as papers_router
 from backend.routes.downloads import router as downloads_router
+from backend.routes.metrics import router as metrics_router
+from backend.routes.traces import router as traces_router
+from backend.routes.admin import router as admin_router
+from backend.routes.arxiv import router as arxiv_router
+from backend.monitoring.memory import configure_tracemalloc
+from backend.monitoring.middleware import MetricsMiddleware
+
+configure_tracemalloc()
 
 app = FastAPI(
     title="Research-Genie API",
@@ -17,7 +30,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(chat_router)
 app.include_router(papers_router)
 app.include_router(downloads_router)
+app.include_router(metrics_router)
+app.include_router(traces_router)
+app.include_router(admin_router)
+app.include_router(arxiv_router)
@@ -0,0 +1,20 @@
+import os
+
+# Set before the backend is imported: the graph reads its provider at import time,
+# and prefetching would fetch the fixture PDF links over the network.
+os.environ["MODEL_PROVIDER"] = "scripted"
+os.environ["PDF_PREFETCH_BUDGET"] = "0"
+
+import pytest
+
+import backend.tools.arxiv as arxiv_tool
+import backend.tools.read as read_tool
+from benchmarks.end_to_end import FIXTURE_ENTRIES, FIXTURE_TEXT
+
+
+@pytest.fixture
+def fixtures(monkeypatch, tmp_path):
+    """Serve arXiv results and PDF text from the end-to-end benchmark fixtures, writing papers under ``tmp_path``."""
+    monkeypatch.setattr(arxiv_tool, "search_arxiv_papers", lambda topic, max_results=5: {"entries": [dict(entry) for entry in FIXTURE_ENTRIES]})
+    monkeypatch.setattr(read_tool, "fetch_pdf_text", lambda url, should_continue=None: FIXTURE_TEXT)
+    monkeypatch.chdir(tmp_path)
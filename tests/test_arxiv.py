@@ -0,0 +1,39 @@
+import pytest
+
+import backend.tools.arxiv as arxiv_tool
+from backend.tools.arxiv import arxiv_search, format_search_results
+
+def search(topic: str):
+    message = arxiv_search.invoke({"type": "tool_call", "name": "arxiv_search", "args": {"topic": topic}, "id": "call_1"})
+    return message.content, message.artifact
+
+
+PAPER = {"title": "A Paper", "authors": ["A. Author"], "summary": "Summary.", "pdf": "http://arxiv.org/pdf/1"}
+
+
+@pytest.mark.parametrize("topic", ["paper 12", "I am interested in paper 3", "the 12th paper", "second paper", "Paper #7"])
+def test_paper_selection_is_not_searched(topic, monkeypatch):
+    monkeypatch.setattr(arxiv_tool, "search_arxiv_papers", lambda *args, **kwargs: pytest.fail("searched a paper selection"))
+
+    content, artifact = search(topic)
+
+    assert content.startswith("ERROR: This appears to be a paper selection request")
+    assert artifact is None
+
+
+@pytest.mark.parametrize("topic", ["Graph Theory", "white papers on 5G", "paperless offices"])
+def test_topics_are_searched(topic, fixtures):
+    content, artifact = search(topic)
+
+    assert "Recent Papers" in content
+    assert len(artifact["papers"]) == 5
+
+
+def test_next_step_lists_the_papers_found():
+    two, _ = format_search_results("graphs", [PAPER] * 2)
+    many, _ = format_search_results("graphs", [PAPER] * 12)
+
+    assert '"I am interested in paper 2"' in two
+    assert "paper 3" not in two
+    assert '"I am interested in paper 5"' in many
+    assert "up to 12" in many
@@ -0,0 +1,89 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.agents import graph as graph_module
+from backend.agents.prompts import INITIAL_PROMPT
+from backend.agents.routing import MODEL_TIER_CALLS
+from backend.services.llm_cache import LLMCache, cache_key
+
+CONVERSATION = ["hello", "make paper on Mathematics", "interested in Graph Theory"]
+FINGERPRINT = {"provider": "test", "model": "test", "params": {}, "tools": []}
+
+
+def run_conversation(thread_id: str) -> list:
+    graph = graph_module.build_graph(MemorySaver())
+    config = {"configurable": {"thread_id": thread_id}}
+    state = None
+    for turn, text in enumerate(CONVERSATION):
+        messages = [HumanMessage(content=text)]
+        if turn == 0:
+            messages.insert(0, SystemMessage(content=INITIAL_PROMPT))
+        state = graph.invoke({"messages": messages}, config)
+    return state["messages"]
+
+
+def test_cached_conversation_matches_uncached(fixtures, monkeypatch, tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(graph_module, "get_llm_cache", lambda: None)
+    uncached = run_conversation("uncached")
+    monkeypatch.setattr(graph_module, "get_llm_cache", lambda: cache)
+    run_conversation("warm")
+
+    calls = MODEL_TIER_CALLS.value(tier="large")
+    cached = run_conversation("cached")
+
+    # Empty answers (the silent turn after a search) are never cached, so only those reach the model.
+    empty = [m for m in uncached if isinstance(m, AIMessage) and not m.content and not m.tool_calls]
+    assert MODEL_TIER_CALLS.value(tier="large") == calls + len(empty)
+    assert [(m.type, m.content) for m in cached] == [(m.type, m.content) for m in uncached]
+    assert [c["name"] for m in cached if isinstance(m, AIMessage) for c in m.tool_calls] == ["arxiv_search"]
+
+
+def test_hit_gets_fresh_tool_call_ids():
+    cache = LLMCache(":memory:")
+    response = AIMessage(content="", id="run-1", tool_calls=[{"name": "arxiv_search", "args": {"topic": "graphs"}, "id": "call_1"}])
+    cache.put("key", response)
+
+    hit = cache.get("key")
+
+    assert hit.tool_calls[0]["args"] == {"topic": "graphs"}
+    assert hit.tool_calls[0]["id"] != "call_1"
+    assert hit.id is None
+
+
+def test_key_ignores_message_ids_but_not_the_model():
+    messages = [HumanMessage(content="hello", id="a")]
+    same = [HumanMessage(content="hello", id="b")]
+
+    assert cache_key(messages, FINGERPRINT) == cache_key(same, FINGERPRINT)
+    assert cache_key(messages, FINGERPRINT) != cache_key(messages, {**FINGERPRINT, "params": {"temperature": 1}})
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(":memory:", max_entries=2)
+    cache.put("a", AIMessage(content="a"))
+    cache.put("b", AIMessage(content="b"))
+    cache.get("a")
+    cache.put("c", AIMessage(content="c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").content == "a"
+    assert len(cache) == 2
+
+
+def test_expired_entry_is_a_miss():
+    cache = LLMCache(":memory:", ttl=0.05)
+    cache.put("a", AIMessage(content="a"))
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_empty_response_is_not_cached():
+    cache = LLMCache(":memory:")
+    cache.put("a", AIMessage(content=""))
+
+    assert cache.get("a") is None
@@ -0,0 +1,29 @@
+import pytest
+
+from backend.monitoring.metrics import Counter, Histogram, _Metric
+
+
+def test_metric_without_samples_cannot_be_created():
+    class Incomplete(_Metric):
+        kind = "counter"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete_total", "A metric missing _samples.")
+
+
+def test_counter_renders_its_samples():
+    counter = Counter("requests_total", "Requests.", ["route"])
+    counter.inc(route="/chat")
+    counter.inc(2, route="/chat")
+
+    assert counter.render() == ["# HELP requests_total Requests.", "# TYPE requests_total counter", 'requests_total{route="/chat"} 3']
+
+
+def test_histogram_counts_and_sums_observations():
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    assert histogram.count() == 2
+    assert histogram.sum() == pytest.approx(0.55)
+    assert 'latency_seconds_bucket{le="0.1"} 1' in histogram.render()
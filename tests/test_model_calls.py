@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from langchain_core.exceptions import ModelConnectionError, ModelInvalidRequestError
+from langchain_core.messages import HumanMessage
+
+from backend.services.model_calls import MODEL_HEDGES, ModelCaller, ModelDeadlineExceeded, classify_error
+from benchmarks.fakes import scripted_attempts
+
+MESSAGES = [HumanMessage(content="hello")]
+
+
+def hedging_caller(max_in_flight: int, threshold: float) -> ModelCaller:
+    caller = ModelCaller(timeout=0, budget=0, max_retries=0, hedge_percentile=0.5, hedge_min_samples=1, max_in_flight=max_in_flight)
+    caller.latency_window("default").add(threshold)
+    return caller
+
+
+def test_hedge_that_answers_first_is_used():
+    model, calls = scripted_attempts((0.5, "first"), (0.01, "hedge"))
+    hedge_wins = MODEL_HEDGES.value(result="hedge")
+
+    response, run_id = hedging_caller(max_in_flight=2, threshold=0.05).invoke_with_run_id(model, MESSAGES)
+
+    assert response.content == "hedge"
+    assert len(calls) == 2
+    assert MODEL_HEDGES.value(result="hedge") == hedge_wins + 1
+
+
+def test_losing_attempt_is_abandoned():
+    model, _ = scripted_attempts((0.5, "first"), (0.01, "hedge"))
+    caller = hedging_caller(max_in_flight=2, threshold=0.05)
+
+    _, winner = caller.invoke_with_run_id(model, MESSAGES)
+
+    assert not caller.is_abandoned(winner)
+    assert len(caller._abandoned) == 1
+
+
+def test_hedge_is_skipped_without_a_free_slot():
+    model, calls = scripted_attempts((0.2, "only"))
+    skipped = MODEL_HEDGES.value(result="skipped")
+
+    response = hedging_caller(max_in_flight=1, threshold=0.01).invoke(model, MESSAGES)
+
+    assert response.content == "only"
+    assert len(calls) == 1
+    assert MODEL_HEDGES.value(result="skipped") == skipped + 1
+
+
+def test_non_retryable_error_is_raised_after_one_attempt():
+    model, calls = scripted_attempts((0, ModelInvalidRequestError("bad request")))
+
+    with pytest.raises(ModelInvalidRequestError):
+        ModelCaller(timeout=1, max_retries=2, backoff=0).invoke(model, MESSAGES)
+    assert len(calls) == 1
+
+
+def test_retryable_error_is_retried():
+    model, calls = scripted_attempts((0, ModelConnectionError("reset")), (0, "ok"))
+
+    response = ModelCaller(timeout=1, max_retries=2, backoff=0).invoke(model, MESSAGES)
+
+    assert response.content == "ok"
+    assert len(calls) == 2
+
+
+def test_retries_stop_at_max_retries():
+    model, calls = scripted_attempts((0, ModelConnectionError("reset")))
+
+    with pytest.raises(ModelConnectionError):
+        ModelCaller(timeout=1, max_retries=2, backoff=0).invoke(model, MESSAGES)
+    assert len(calls) == 3
+
+
+def test_attempt_past_its_deadline_times_out():
+    model, _ = scripted_attempts((0.3, "late"))
+
+    with pytest.raises(ModelDeadlineExceeded) as error:
+        ModelCaller(timeout=0.1, budget=0, max_retries=0).invoke(model, MESSAGES)
+    assert classify_error(error.value) == "timeout"
+
+
+def test_retries_stop_when_the_budget_is_spent():
+    model, calls = scripted_attempts((0.3, "late"))
+    started = time.perf_counter()
+
+    with pytest.raises(ModelDeadlineExceeded):
+        ModelCaller(timeout=0.2, budget=0.5, max_retries=10, backoff=0.01).invoke(model, MESSAGES)
+    assert time.perf_counter() - started < 0.5 + 0.2
+    assert len(calls) < 11
+
+
+def test_abandoned_attempts_hold_their_slot():
+    model, calls = scripted_attempts((0.15, "late"), (0, "ok"))
+    caller = ModelCaller(timeout=0.1, budget=0, max_retries=1, backoff=0, max_in_flight=1)
+    started = time.perf_counter()
+
+    response = caller.invoke(model, MESSAGES)
+
+    # The retry waits until the timed-out first attempt has actually finished.
+    assert response.content == "ok"
+    assert time.perf_counter() - started >= 0.15
+    assert len(calls) == 2
@@ -0,0 +1,31 @@
+import time
+
+import backend.tools.arxiv as arxiv_tool
+from backend.interactors.chat import ChatInteractor
+from backend.schemas.chat import ChatMessage
+from backend.services.prefetch import pdf_prefetcher
+from backend.services.rate_limit import arxiv_rate_limiter
+from benchmarks.fakes import FakeUpstream
+
+
+def wait_for_prefetches(thread_id: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while pdf_prefetcher.pending(thread_id) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_search_then_summary_prefetches_only_the_summarized_paper(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pdf_prefetcher, "budget", 1)
+    monkeypatch.setattr(arxiv_rate_limiter, "interval", 0)
+    interactor = ChatInteractor()
+
+    with FakeUpstream() as upstream:
+        monkeypatch.setattr(arxiv_tool, "ARXIV_API_URL", upstream.arxiv_api_url)
+        interactor.process_chat(ChatMessage(message="interested in Prefetch Topology", thread_id="prefetch"))
+        wait_for_prefetches("prefetch")
+        assert upstream.requests["pdf"] == 0
+
+        interactor.process_chat(ChatMessage(message="I am interested in paper 2", thread_id="prefetch"))
+        wait_for_prefetches("prefetch")
+        assert upstream.requests["pdf"] == 1
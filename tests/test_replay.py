@@ -0,0 +1,76 @@
+import json
+import sys
+
+from backend.agents import graph as graph_module
+from backend.agents.routing import MODEL_TIER_ESCALATIONS
+from backend.interactors.chat import ChatInteractor
+from backend.monitoring import recording
+from backend.schemas.chat import ChatMessage
+from backend.services.model_calls import model_caller
+from benchmarks import replay
+from benchmarks.replay import load_sessions, replay_session
+
+SEARCH_SESSION = ["hello", "make paper on Mathematics", "interested in Graph Theory"]
+# With nothing analysed yet, "write" is a fast-tier step whose generate_comprehensive_paper call is escalated.
+ESCALATING_SESSION = ["hello", "make paper on Mathematics", "Yes, write the paper"]
+
+
+def record_session(thread_id, messages):
+    interactor = ChatInteractor()
+    for text in messages:
+        interactor.process_chat(ChatMessage(message=text, thread_id=thread_id))
+
+
+def test_tiered_session_with_escalation_replays(fixtures, monkeypatch, tmp_path):
+    recordings = tmp_path / "recordings"
+    monkeypatch.setattr(recording, "SESSION_RECORD_DIR", str(recordings))
+    monkeypatch.setattr(graph_module, "model_routing", "tiered")
+    escalations = MODEL_TIER_ESCALATIONS.value(reason="generation_tool_call")
+
+    record_session("tiered", ESCALATING_SESSION)
+
+    assert MODEL_TIER_ESCALATIONS.value(reason="generation_tool_call") == escalations + 1
+    records = load_sessions([recordings])["tiered"]
+    assert [r["type"] for r in records].count("model_discarded") == 1
+    turns = replay_session("tiered", records, simulate_latency=False, track_memory=False)
+    assert [turn["message"] for turn in turns] == ESCALATING_SESSION
+
+
+def recorded_with_error(fixtures, monkeypatch, tmp_path, error: dict) -> list:
+    """A recorded search session whose first model call failed with ``error`` before the recorded answer."""
+    recordings = tmp_path / "recordings"
+    monkeypatch.setattr(recording, "SESSION_RECORD_DIR", str(recordings))
+    record_session("errors", SEARCH_SESSION)
+    records = load_sessions([recordings])["errors"]
+    first_model = next(i for i, r in enumerate(records) if r["type"] == "model")
+    records.insert(first_model, {"type": "model", "request_id": records[0]["request_id"], "duration_ms": 1.0, **error})
+    return records
+
+
+def test_recorded_retryable_error_is_retried_on_replay(fixtures, monkeypatch, tmp_path):
+    monkeypatch.setattr(model_caller, "backoff", 0)
+    records = recorded_with_error(fixtures, monkeypatch, tmp_path, {"error": "ModelRateLimitError: 429", "error_class": "rate_limited"})
+    turns = replay_session("errors", records, simulate_latency=False, track_memory=False)
+    assert [turn["message"] for turn in turns] == SEARCH_SESSION
+
+
+def test_recorded_error_without_class_is_retried_by_type_name(fixtures, monkeypatch, tmp_path):
+    monkeypatch.setattr(model_caller, "backoff", 0)
+    records = recorded_with_error(fixtures, monkeypatch, tmp_path, {"error": "ModelConnectionError: reset"})
+    turns = replay_session("errors", records, simulate_latency=False, track_memory=False)
+    assert len(turns) == len(SEARCH_SESSION)
+
+
+def test_failing_session_does_not_abort_the_replay_run(fixtures, monkeypatch, tmp_path, capsys):
+    records = recorded_with_error(fixtures, monkeypatch, tmp_path, {"error": "ModelInvalidRequestError: bad", "error_class": "invalid_request"})
+    replays = tmp_path / "replays"
+    replays.mkdir()
+    (replays / "broken.jsonl").write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    (tmp_path / "recordings" / "errors.jsonl").rename(replays / "intact.jsonl")
+    monkeypatch.setattr(sys, "argv", ["replay", str(replays)])
+
+    replay.main()
+
+    output = capsys.readouterr().out
+    assert "Replayed 1 sessions" in output
+    assert "failed: broken: ModelInvalidRequestError: bad" in output
@@ -0,0 +1,64 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.agents import graph as graph_module
+from backend.agents.routing import MODEL_TIER_CALLS, MODEL_TIER_ESCALATIONS, choose_tier, escalation_reason
+
+
+def tool_result(name: str) -> ToolMessage:
+    return ToolMessage(content="result", name=name, tool_call_id=f"call_{name}")
+
+
+def answer(content: str, **kwargs):
+    return RunnableLambda(lambda messages: AIMessage(content=content, **kwargs))
+
+
+def ask(monkeypatch, fast, large, text: str = "hello") -> AIMessage:
+    monkeypatch.setattr(graph_module, "model_routing", "tiered")
+    monkeypatch.setattr(graph_module, "get_llm_cache", lambda: None)
+    monkeypatch.setattr(graph_module, "_models", {"fast": fast, "large": large})
+    graph = graph_module.build_graph(MemorySaver())
+    state = graph.invoke({"messages": [HumanMessage(content=text)]}, {"configurable": {"thread_id": "routing"}})
+    return state["messages"][-1]
+
+
+def test_control_steps_go_to_the_fast_tier():
+    assert choose_tier([HumanMessage(content="hello")]) == "fast"
+    assert choose_tier([HumanMessage(content="x"), tool_result("arxiv_search")]) == "fast"
+
+
+def test_analysis_and_writing_go_to_the_large_tier():
+    assert choose_tier([HumanMessage(content="x"), tool_result("summarize_paper")]) == "large"
+    assert choose_tier([tool_result("read_pdf"), HumanMessage(content="choose best topics for me")]) == "large"
+    assert choose_tier([HumanMessage(content="x" * 10_000)]) == "large"
+
+
+def test_writing_resets_to_the_fast_tier():
+    messages = [tool_result("read_pdf"), tool_result("generate_comprehensive_paper"), HumanMessage(content="Yes, generate PDF")]
+    assert choose_tier(messages) == "fast"
+
+
+def test_escalation_reasons():
+    assert escalation_reason(AIMessage(content="ok")) is None
+    assert escalation_reason(AIMessage(content="cut", response_metadata={"finish_reason": "MAX_TOKENS"})) == "truncated"
+    call = {"name": "generate_comprehensive_paper", "args": {}, "id": "call_1"}
+    assert escalation_reason(AIMessage(content="", tool_calls=[call])) == "generation_tool_call"
+
+
+def test_fast_answer_is_kept(monkeypatch):
+    large_calls = MODEL_TIER_CALLS.value(tier="large")
+
+    response = ask(monkeypatch, answer("fast"), answer("large"))
+
+    assert response.content == "fast"
+    assert MODEL_TIER_CALLS.value(tier="large") == large_calls
+
+
+def test_truncated_fast_answer_is_redone_on_the_large_tier(monkeypatch):
+    escalations = MODEL_TIER_ESCALATIONS.value(reason="truncated")
+
+    response = ask(monkeypatch, answer("cut", response_metadata={"finish_reason": "MAX_TOKENS"}), answer("large"))
+
+    assert response.content == "large"
+    assert MODEL_TIER_ESCALATIONS.value(reason="truncated") == escalations + 1